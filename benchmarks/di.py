@@ -0,0 +1,211 @@
+"""
+Накладные расходы внедрения зависимостей на запрос.
+
+Сравниваются маршрут GET заказа в прежнем виде - @inject, сервис
+из Factory контейнера на каждый запрос и синхронный check_auth
+с Provide["auth_service"] (FastAPI выполняет его в пуле потоков) -
+и в текущем: сервис-синглтон из app.state и async check_auth.
+Маршруты не обращаются к сервису, а запросы идут прямо в ASGI
+приложение без клиента, поэтому измеряются только маршрутизация,
+зависимости и сериализация ответа.
+
+Отдельно - попадание в кэш redis_cache (Redis в памяти процесса):
+прежде на каждый вызов контейнер разрешал Provide["redis"].
+
+Пример:
+    PYTHONPATH=src python benchmarks/di.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Annotated, Any
+from uuid import UUID, uuid4
+
+from dependency_injector import providers
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, FastAPI, Security
+from faststream.rabbit import RabbitBroker
+
+from api.dependencies import bind_services, get_order_service
+from common.config import settings
+from common.container import Container
+from services.auth import AuthService
+from services.order import OrderService
+from services.utils.auth import check_auth, oauth2_scheme
+from services.utils.cache import build_cache_key, dump_cache_value, redis_cache
+
+
+class LegacyContainer(Container):
+    """Контейнер с сервисом заказов из Factory, как до синглтонов."""
+
+    order_service = providers.Factory(
+        OrderService,
+        repositories=Container.order_repositories,
+        publisher=Container.broker_publisher,
+        redis=Container.redis,
+        order_filter=Container.order_bloom_filter,
+        event_hub=Container.order_event_hub,
+    )
+
+
+@inject
+def legacy_check_auth(
+    token: str = Security(oauth2_scheme),
+    auth_service: AuthService = Depends(Provide["auth_service"]),
+) -> UUID:
+    payload = auth_service.decode_jwt(token)
+    return UUID(payload["id"])
+
+
+def make_legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/orders/{order_id}")
+    @inject
+    async def get_order(
+        order_id: UUID,
+        user_id: Annotated[UUID, Depends(legacy_check_auth)],
+        service: OrderService = Depends(Provide[LegacyContainer.order_service]),
+    ) -> dict[str, Any]:
+        return {"id": order_id, "user_id": user_id}
+
+    return app
+
+
+def make_app(container: Container) -> FastAPI:
+    app = FastAPI()
+    bind_services(app, container)
+
+    @app.get("/orders/{order_id}")
+    async def get_order(
+        order_id: UUID,
+        user_id: Annotated[UUID, Depends(check_auth)],
+        service: Annotated[OrderService, Depends(get_order_service)],
+    ) -> dict[str, Any]:
+        return {"id": order_id, "user_id": user_id}
+
+    return app
+
+
+async def asgi_get(app: FastAPI, path: str, headers: list[tuple[bytes, bytes]]) -> int:
+    """GET прямо в ASGI приложение, возвращает статус ответа."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+    status = 0
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+class MemoryRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+
+class CachedService:
+    def __init__(self, redis: MemoryRedis) -> None:
+        self.redis = redis
+
+    @redis_cache(ttl=300, namespace="bench", hash_tag_kwarg="user_id")
+    async def get(self, *, order_id: UUID, user_id: UUID) -> dict[str, Any]:
+        raise AssertionError("Cache miss")
+
+
+@inject
+async def legacy_get(
+    service: CachedService,
+    order_id: UUID,
+    user_id: UUID,
+    redis: Any = Provide["redis"],
+) -> dict[str, Any]:
+    # Прежний wrapper: то же чтение кэша плюс разрешение Provide["redis"].
+    return await service.get(order_id=order_id, user_id=user_id)
+
+
+async def measure(name: str, requests: int, call: Callable[[], Awaitable[Any]]) -> None:
+    for _ in range(min(requests, 500)):
+        await call()
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call()
+    elapsed = time.perf_counter() - started
+    rps, us = requests / elapsed, elapsed / requests * 1e6
+    print(f"{name:<28}{rps:>14.0f}{us:>12.1f}")
+
+
+async def run(requests: int) -> None:
+    broker = RabbitBroker(settings.rabbit.url)
+    legacy_container = LegacyContainer(rabbit_broker=broker)
+    legacy_container.wire(modules=[sys.modules[__name__]])
+    container = Container(rabbit_broker=broker)
+
+    legacy_app = make_legacy_app()
+    app = make_app(container)
+
+    user_id = uuid4()
+    token = AuthService.create_token({"id": str(user_id)}, timedelta(hours=1))
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    path = f"/orders/{uuid4()}"
+    assert await asgi_get(legacy_app, path, headers) == 200
+    assert await asgi_get(app, path, headers) == 200
+
+    print(f"{'mode':<28}{'requests/s':>14}{'us/request':>12}")
+    await measure(
+        "@inject + Factory", requests, lambda: asgi_get(legacy_app, path, headers)
+    )
+    await measure("app.state singleton", requests, lambda: asgi_get(app, path, headers))
+
+    redis = MemoryRedis()
+    service = CachedService(redis)
+    order_id = uuid4()
+    key = build_cache_key(
+        "bench", hash_tag=str(user_id), order_id=order_id, user_id=user_id
+    )
+    redis.data[key] = dump_cache_value({"id": str(order_id)})
+    await measure(
+        "redis_cache, Provide",
+        requests,
+        lambda: legacy_get(service, order_id, user_id),
+    )
+    await measure(
+        "redis_cache, self.redis",
+        requests,
+        lambda: service.get(order_id=order_id, user_id=user_id),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -0,0 +1,99 @@
+"""
+Пропускная способность публикации в RabbitMQ на тестовом брокере.
+
+TestRabbitBroker не ходит в RabbitMQ, а сразу вызывает подписчика,
+поэтому измеряются накладные расходы Python на публикацию (кодирование,
+middleware, обработка) без сетевых задержек и подтверждений. Выигрыш
+конвейера подтверждений на настоящем брокере здесь не виден, а большую
+часть времени тестовый брокер тратит на собственные mock-сообщения.
+Показательно время вызывающего при enqueue.
+
+Пример:
+    PYTHONPATH=src python benchmarks/publisher.py --messages 20000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from uuid import uuid4
+
+from faststream.rabbit import RabbitBroker, TestRabbitBroker
+
+from broker.publisher import BrokerPublisher
+
+
+QUEUE = "bench"
+
+
+def make_message() -> dict:
+    return {"data": {"id": str(uuid4()), "user_id": str(uuid4())}}
+
+
+async def measure(
+    name: str, messages: int, publish: Callable[[int], Awaitable[None]]
+) -> None:
+    started = time.perf_counter()
+    await publish(messages)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<24}{messages / elapsed:>14.0f}")
+
+
+async def run(messages: int, batch_size: int) -> None:
+    # Без журнала обработки каждого сообщения.
+    broker = RabbitBroker(logger=None)
+    received = 0
+
+    @broker.subscriber(QUEUE)
+    async def handle(data: dict) -> None:
+        nonlocal received
+        received += 1
+
+    async with TestRabbitBroker(broker):
+        publisher = BrokerPublisher(broker, batch_size=batch_size, drain_timeout=600)
+        await publisher.start()
+
+        async def broker_sequential(count: int) -> None:
+            for _ in range(count):
+                await broker.publish(make_message(), QUEUE)
+
+        async def publisher_sequential(count: int) -> None:
+            for _ in range(count):
+                await publisher.publish(make_message(), QUEUE)
+
+        async def publisher_concurrent(count: int) -> None:
+            for _ in range(0, count, batch_size):
+                await asyncio.gather(
+                    *(
+                        publisher.publish(make_message(), QUEUE)
+                        for _ in range(batch_size)
+                    )
+                )
+
+        async def publisher_enqueue(count: int) -> None:
+            for _ in range(count):
+                await publisher.enqueue(make_message(), QUEUE)
+
+        print(f"{'mode':<24}{'messages/s':>14}")
+        await measure("broker.publish", messages, broker_sequential)
+        await measure("publish", messages, publisher_sequential)
+        await measure("publish, gather", messages, publisher_concurrent)
+        # Время вызывающего: пока очередь не заполнена, он не ждёт публикации.
+        started = time.perf_counter()
+        await measure("enqueue (caller)", messages, publisher_enqueue)
+        await publisher.stop()
+        elapsed = time.perf_counter() - started
+        print(f"{'enqueue + drain':<24}{messages / elapsed:>14.0f}")
+
+    print(f"received {received}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.batch_size))
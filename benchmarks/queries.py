@@ -0,0 +1,164 @@
+"""
+Накладные расходы Python на вызов методов репозиториев без БД.
+
+Сессия-заглушка делает то же, что Connection.execute до обращения
+к драйверу: ищет скомпилированный запрос в кэше SQLAlchemy (для этого
+строится ключ кэша запроса) и компилирует его при промахе. Сравниваются
+запросы, собираемые на каждый вызов (как раньше), и построенные
+один раз с bindparam.
+
+Пример:
+    PYTHONPATH=src python benchmarks/queries.py --calls 20000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import Executable
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.util import LRUCache
+
+from models.order import Order
+from repositories.repositories import OrderRepository
+from schemas.enums.order import OrderStatusEnum
+from schemas.order import OrderDbSchema
+
+
+class FakeResult:
+    def scalars(self) -> "FakeResult":
+        return self
+
+    def all(self) -> list[Any]:
+        return []
+
+
+class FakeSession:
+    """Компилирует запрос через кэш SQLAlchemy, в БД не ходит."""
+
+    def __init__(self) -> None:
+        self.dialect = asyncpg_dialect()
+        self.cache = LRUCache(500)
+
+    def _compile(self, statement: Executable, params: dict | None) -> None:
+        statement._compile_w_cache(
+            self.dialect,
+            compiled_cache=self.cache,
+            column_keys=sorted(params or ()),
+        )
+
+    async def scalar(self, statement: Executable, params: dict | None = None) -> None:
+        self._compile(statement, params)
+
+    async def scalars(self, statement: Executable, params: dict | None = None):
+        self._compile(statement, params)
+        return FakeResult()
+
+    async def execute(self, statement: Executable, params: dict | None = None):
+        self._compile(statement, params)
+        return FakeResult()
+
+
+async def legacy_get_by(repo: OrderRepository, session: FakeSession) -> None:
+    query = repo.get_base_query().where(Order.id == uuid4())
+    await session.scalar(query)
+
+
+async def legacy_add(repo: OrderRepository, session: FakeSession) -> None:
+    query = repo.get_insert_query().values(**make_order())
+    await session.scalar(query)
+
+
+async def legacy_update(repo: OrderRepository, session: FakeSession) -> None:
+    query = (
+        repo.get_update_query()
+        .where(Order.id == uuid4())
+        .values(status=OrderStatusEnum.PAID)
+    )
+    await session.scalar(query)
+
+
+async def legacy_get_orders(repo: OrderRepository, session: FakeSession) -> None:
+    now = datetime.now(UTC)
+    query = (
+        repo.get_base_query()
+        .where(Order.user_id == uuid4())
+        .where(Order.created_at >= now - timedelta(days=30))
+        .where(Order.created_at < now)
+    )
+    await session.execute(query)
+
+
+def make_order() -> dict[str, Any]:
+    return {
+        "user_id": uuid4(),
+        "items": {"item-1": {"qty": 1, "price": 9.99}},
+        "total_price": 9.99,
+        "status": OrderStatusEnum.PENDING,
+    }
+
+
+def make_cases(
+    repo: OrderRepository, session: FakeSession
+) -> dict[str, tuple[Callable[[], Awaitable], Callable[[], Awaitable]]]:
+    """Метод -> (запрос на каждый вызов, построенный заранее)."""
+
+    async def get_orders() -> None:
+        now = datetime.now(UTC)
+        await repo.get_orders(
+            uuid4(),
+            created_from=now - timedelta(days=30),
+            created_to=now,
+            session=session,
+        )
+
+    return {
+        "get_by": (
+            lambda: legacy_get_by(repo, session),
+            lambda: repo.get_by("id", uuid4(), session=session),
+        ),
+        "add": (
+            lambda: legacy_add(repo, session),
+            lambda: repo.add(make_order(), session=session),
+        ),
+        "update": (
+            lambda: legacy_update(repo, session),
+            lambda: repo.update(
+                uuid4(), {"status": OrderStatusEnum.PAID}, session=session
+            ),
+        ),
+        "get_orders": (lambda: legacy_get_orders(repo, session), get_orders),
+    }
+
+
+async def measure(call: Callable[[], Awaitable], calls: int) -> float:
+    """Микросекунды CPU на вызов."""
+    await call()
+    started = time.process_time()
+    for _ in range(calls):
+        await call()
+    return (time.process_time() - started) / calls * 1_000_000
+
+
+async def run(calls: int) -> None:
+    repo = OrderRepository(None, Order, OrderDbSchema)
+    session = FakeSession()
+    print(f"{'method':<12}{'per call, us':>14}{'prebuilt, us':>14}{'speedup':>10}")
+    for name, (legacy, prebuilt) in make_cases(repo, session).items():
+        before = await measure(legacy, calls)
+        after = await measure(prebuilt, calls)
+        print(f"{name:<12}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
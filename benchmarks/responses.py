@@ -0,0 +1,95 @@
+"""
+CPU на запрос и размер ответа для форматов списка заказов.
+
+Приложение собирается из тех же частей, что и API (NegotiatedResponse,
+RequestContextMiddleware, CompressionMiddleware), без БД: маршрут
+возвращает заранее созданные заказы. Запросы идут через ASGI в одном
+процессе, поэтому время включает и разбор ответа клиентом httpx.
+
+Пример:
+    PYTHONPATH=src python benchmarks/responses.py --orders 100 --requests 500
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+
+from api.negotiation import NegotiatedResponse
+from middlewares.compression import CompressionMiddleware
+from middlewares.request_context import RequestContextMiddleware
+from schemas.enums.order import OrderStatusEnum
+from schemas.order import OrderDbSchema
+
+
+FORMATS = {
+    "json": {"Accept": "application/json", "Accept-Encoding": "identity"},
+    "json+gzip": {"Accept": "application/json", "Accept-Encoding": "gzip"},
+    "json+zstd": {"Accept": "application/json", "Accept-Encoding": "zstd"},
+    "msgpack": {"Accept": "application/msgpack", "Accept-Encoding": "identity"},
+    "msgpack+gzip": {"Accept": "application/msgpack", "Accept-Encoding": "gzip"},
+    "msgpack+zstd": {"Accept": "application/msgpack", "Accept-Encoding": "zstd"},
+}
+
+
+def make_orders(count: int) -> list[OrderDbSchema]:
+    now = datetime.now(UTC)
+    user_id = uuid4()
+    return [
+        OrderDbSchema(
+            id=uuid4(),
+            created_at=now,
+            updated_at=now,
+            user_id=user_id,
+            items={f"item-{j}": {"qty": j + 1, "price": 9.99 * j} for j in range(5)},
+            total_price=123.45,
+            status=OrderStatusEnum.PENDING,
+        )
+        for _ in range(count)
+    ]
+
+
+def make_app(orders: list[OrderDbSchema]) -> FastAPI:
+    app = FastAPI(default_response_class=NegotiatedResponse)
+
+    @app.get("/orders/")
+    async def get_orders() -> list[OrderDbSchema]:
+        return orders
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def run(orders_count: int, requests: int) -> None:
+    app = make_app(make_orders(orders_count))
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://bench"
+    ) as client:
+        print(f"{'format':<14}{'CPU ms/request':>16}{'bytes':>10}")
+        for name, headers in FORMATS.items():
+            response = await client.get("/orders/", headers=headers)
+            size = len(response.content)
+            if "content-encoding" in response.headers:
+                size = int(response.headers["content-length"])
+
+            started = time.process_time()
+            for _ in range(requests):
+                await client.get("/orders/", headers=headers)
+            cpu = (time.process_time() - started) / requests * 1000
+            print(f"{name:<14}{cpu:>16.3f}{size:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.orders, args.requests))
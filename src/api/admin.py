@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends, Query
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRouter
+
+from api.dependencies import get_export_service
+from schemas.enums.export import ExportFormatEnum
+from services.export import MEDIA_TYPES, ExportService
+from services.utils.auth import check_admin
+from services.utils.compression import cache_codec
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(check_admin)])
+
+
+@router.get(
+    "/orders/export",
+)
+async def export_orders(
+    service: Annotated[ExportService, Depends(get_export_service)],
+    export_format: Annotated[ExportFormatEnum, Query(alias="format")] = (
+        ExportFormatEnum.CSV
+    ),
+    compress: Annotated[bool, Query(alias="gzip")] = False,
+    user_id: Annotated[UUID | None, Query()] = None,
+    created_from: Annotated[datetime | None, Query()] = None,
+    created_to: Annotated[datetime | None, Query()] = None,
+) -> StreamingResponse:
+    """Потоковая выгрузка заказов пользователя или за период."""
+    filename = service.get_filename(export_format, compress)
+
+    return StreamingResponse(
+        service.export_orders(
+            export_format,
+            compress=compress,
+            user_id=user_id,
+            created_from=created_from,
+            created_to=created_to,
+        ),
+        media_type="application/gzip" if compress else MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/cache/stats",
+)
+async def cache_stats() -> dict[str, Any]:
+    """Метрики сжатия кэша текущего процесса."""
+    return cache_codec.stats.as_dict()
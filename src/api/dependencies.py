@@ -0,0 +1,35 @@
+"""
+Сервисы для эндпоинтов.
+
+Сервисы создаются один раз при старте (bind_services) и хранятся
+в app.state, поэтому запрос не разрешает зависимости контейнера.
+"""
+
+from fastapi import FastAPI, Request
+
+from common.container import Container
+from services.export import ExportService
+from services.order import OrderService
+from services.user import UserService
+
+
+def bind_services(app: FastAPI, container: Container) -> None:
+    """Создаёт сервисы эндпоинтов и сохраняет их в app.state."""
+    app.state.user_service = container.user_service()
+    app.state.order_service = container.order_service()
+    app.state.export_service = container.export_service()
+
+
+# Зависимости async: синхронные FastAPI выполняет в пуле потоков.
+
+
+async def get_user_service(request: Request) -> UserService:
+    return request.app.state.user_service
+
+
+async def get_order_service(request: Request) -> OrderService:
+    return request.app.state.order_service
+
+
+async def get_export_service(request: Request) -> ExportService:
+    return request.app.state.export_service
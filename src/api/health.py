@@ -0,0 +1,28 @@
+from fastapi import Request, Response
+from fastapi.routing import APIRouter
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get(
+    "/live",
+)
+async def live() -> dict[str, str]:
+    """Процесс жив (liveness probe)."""
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+)
+async def ready(request: Request, response: Response) -> dict[str, str]:
+    """
+    Процесс прогрет и готов принимать трафик (readiness probe).
+    До окончания прогрева и во время остановки - 503.
+    """
+    if not getattr(request.app.state, "ready", False):
+        response.status_code = HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting"}
+    return {"status": "ok"}
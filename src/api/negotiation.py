@@ -0,0 +1,67 @@
+"""Выбор формата ответа по заголовку Accept."""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+from common.context import get_current_scope
+
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack опционален
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def get_quality(accept: str, media_type: str) -> float:
+    """Вес media_type в заголовке Accept, 0 - не принимается."""
+    for part in accept.split(","):
+        value, *params = part.split(";")
+        if value.strip().lower() != media_type:
+            continue
+        for param in params:
+            name, _, quality = param.strip().partition("=")
+            if name == "q":
+                try:
+                    return float(quality)
+                except ValueError:
+                    return 0.0
+        return 1.0
+    return 0.0
+
+
+def accepts_msgpack(accept: str) -> bool:
+    msgpack_quality = max(get_quality(accept, t) for t in MSGPACK_MEDIA_TYPES)
+    return msgpack_quality > 0 and msgpack_quality >= get_quality(
+        accept, JSONResponse.media_type
+    )
+
+
+class NegotiatedResponse(JSONResponse):
+    """
+    Ответ в msgpack, если клиент предпочитает его (Accept:
+    application/msgpack), иначе в JSON.
+
+    Содержимое уже сериализовано FastAPI по схеме ответа (UUID и даты -
+    строки), поэтому msgpack только упаковывает его - без json.dumps.
+    Заголовки запроса берутся из контекста (RequestContextMiddleware).
+    """
+
+    def render(self, content: Any) -> bytes:
+        scope = get_current_scope()
+        if (
+            msgpack is not None
+            and scope is not None
+            and accepts_msgpack(Headers(scope=scope).get("accept", ""))
+        ):
+            self.media_type = MSGPACK_MEDIA_TYPES[0]
+            return msgpack.packb(content)
+        return super().render(content)
+
+    def init_headers(self, headers: Any = None) -> None:
+        super().init_headers(headers)
+        self.raw_headers.append((b"vary", b"Accept"))
@@ -1,32 +1,59 @@
+from datetime import datetime
 from typing import Annotated, Any
 from uuid import UUID
 
-from dependency_injector.wiring import Provide, inject
-from fastapi import Body, Depends
+from fastapi import Body, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
-from common.container import Container
-from schemas.enums.order import OrderStatusEnum
-from schemas.order import OrderBodySchema, OrderDbSchema
+from api.dependencies import get_order_service, get_user_service
+from api.negotiation import NegotiatedResponse
+from common.config import settings
+from schemas.enums.order import OrderFieldEnum, OrderStatusEnum
+from schemas.order import OrderBodySchema, OrderDbSchema, OrderPartialSchema
 from schemas.user import UserDbSchema, UserRegisterBodySchema
 from services.order import OrderService
 from services.user import UserService
-from services.utils.auth import check_auth
+from services.utils.auth import check_auth, check_stream_auth
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=NegotiatedResponse)
 
 UserId = Annotated[UUID, Depends(check_auth)]
+OrderServiceDep = Annotated[OrderService, Depends(get_order_service)]
+UserServiceDep = Annotated[UserService, Depends(get_user_service)]
+
+
+def get_order_fields(
+    fields: Annotated[
+        str | None,
+        Query(description="Поля заказа через запятую, например id,status"),
+    ] = None,
+) -> frozenset[OrderFieldEnum] | None:
+    """Поля ответа из параметра fields, None - все поля."""
+    names = [field.strip() for field in (fields or "").split(",")]
+    try:
+        selected = frozenset(OrderFieldEnum(name) for name in names if name)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Допустимые поля: {', '.join(OrderFieldEnum)}",
+        )
+    # Пустой список (fields=, или fields=,,) - тоже все поля.
+    return selected or None
+
+
+OrderFields = Annotated[frozenset[OrderFieldEnum] | None, Depends(get_order_fields)]
 
 
 @router.post(
     "/register/",
 )
-@inject
 async def register(
     body: UserRegisterBodySchema,
-    service: UserService = Depends(Provide[Container.user_service]),
+    service: UserServiceDep,
 ) -> UserDbSchema:
     """Регистрирует пользователя."""
     return await service.create_user(user_data=body)
@@ -35,10 +62,9 @@ async def register(
 @router.post(
     "/token/",
 )
-@inject
 async def get_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    service: UserService = Depends(Provide[Container.user_service]),
+    service: UserServiceDep,
 ) -> dict[str, Any]:
     """Возвращает JWT токен."""
     return {
@@ -52,11 +78,10 @@ async def get_token(
 @router.post(
     "/orders/",
 )
-@inject
 async def create_order(
     user_id: UserId,
     body: OrderBodySchema,
-    service: OrderService = Depends(Provide[Container.order_service]),
+    service: OrderServiceDep,
 ) -> OrderDbSchema:
     """Возвращает заказы пользователя."""
 
@@ -69,43 +94,83 @@ async def create_order(
     )
 
 
+@router.get(
+    "/orders/events",
+)
+async def order_events(
+    user_id: Annotated[UUID, Depends(check_stream_auth)],
+    service: OrderServiceDep,
+    order_id: Annotated[UUID | None, Query()] = None,
+) -> StreamingResponse:
+    """
+    Поток изменений заказов пользователя (Server-Sent Events) вместо
+    периодических запросов GET /orders/{order_id}.
+    """
+    if order_id is not None:
+        # Ошибки доступа - до начала потока, обычным ответом.
+        await service.get_order(order_id=order_id, user_id=user_id)
+
+    return StreamingResponse(
+        service.stream_events(
+            user_id=user_id,
+            order_id=order_id,
+            heartbeat=settings.events.ORDER_EVENTS_HEARTBEAT,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/orders/{order_id}",
+    response_model_exclude_unset=True,
 )
-@inject
 async def get_order(
     order_id: UUID,
     user_id: UserId,
-    service: OrderService = Depends(Provide[Container.order_service]),
-) -> OrderDbSchema:
-    """Возвращает заказ."""
-    return await service.get_order(order_id=order_id, user_id=user_id)
+    fields: OrderFields,
+    service: OrderServiceDep,
+) -> OrderPartialSchema:
+    """Возвращает заказ (поля fields или все)."""
+    return await service.get_order(order_id=order_id, user_id=user_id, fields=fields)
 
 
 @router.patch(
     "/orders/{order_id}",
 )
-@inject
 async def update_order(
     order_id: UUID,
     status: Annotated[OrderStatusEnum, Body(embed=True)],
     user_id: UserId,
-    service: OrderService = Depends(Provide[Container.order_service]),
+    service: OrderServiceDep,
 ) -> OrderDbSchema:
     """Обновляет статус заказа."""
-    return await service.update_status(order_id, user_id, status)
+    return await service.update_status(
+        order_id=order_id, user_id=user_id, order_status=status
+    )
 
 
 @router.patch(
     "/orders/user/",
+    response_model_exclude_unset=True,
 )
-@inject
 async def get_orders(
     user_id: UserId,
-    service: OrderService = Depends(Provide[Container.order_service]),
-) -> list[OrderDbSchema]:
-    """Возвращает заказы пользователя."""
+    fields: OrderFields,
+    service: OrderServiceDep,
+    created_from: Annotated[datetime | None, Query()] = None,
+    created_to: Annotated[datetime | None, Query()] = None,
+) -> list[OrderPartialSchema]:
+    """
+    Возвращает заказы пользователя. Для списков без состава заказа
+    стоит передавать fields без items - они не читаются из БД.
+    """
     # TODO Логичнее чтобы путь маршрута был /orders/user/,
     #  а user_id брать из токена
     #  По хорошему нужна пагинация
-    return await service.get_orders(user_id=user_id)
+    return await service.get_orders(
+        user_id=user_id,
+        created_from=created_from,
+        created_to=created_to,
+        fields=fields,
+    )
@@ -0,0 +1,73 @@
+"""
+Публикация FastStream через собственные каналы подключения брокера.
+
+Публичного API для публикации через другой канал того же подключения
+у FastStream нет, поэтому здесь используются его внутренние объекты
+(версия faststream закреплена в pyproject.toml, публикацию через них
+проверяет tests/test_publisher.py). Обращения к ним - только в этом
+модуле.
+"""
+
+from typing import Any
+
+from faststream.broker.message import gen_cor_id
+from faststream.rabbit import RabbitBroker, RabbitQueue
+from faststream.rabbit.helpers.channel_manager import ChannelManager
+from faststream.rabbit.helpers.declarer import RabbitDeclarer
+from faststream.rabbit.publisher.producer import AioPikaFastProducer
+from faststream.rabbit.schemas import Channel
+from faststream.types import SendableMessage
+
+
+ChannelProducer = AioPikaFastProducer
+
+
+async def create_channel_producers(
+    broker: RabbitBroker, channels: int
+) -> list[ChannelProducer]:
+    """Producer на каждый из channels каналов с подтверждениями."""
+    connection = broker._connection
+    if connection is None:
+        # Тестовый брокер (TestRabbitBroker) не подключается к RabbitMQ.
+        if broker._producer is None:
+            raise RuntimeError("Broker is not connected")
+        return [broker._producer]
+
+    producers = []
+    for _ in range(channels):
+        # Свой менеджер - свой канал, объявленные обменники - на нём же.
+        manager = ChannelManager(
+            connection, default_channel=Channel(publisher_confirms=True)
+        )
+        await manager.get_channel()
+        producers.append(
+            AioPikaFastProducer(
+                declarer=RabbitDeclarer(manager),
+                parser=broker._parser,
+                decoder=broker._decoder,
+            )
+        )
+    return producers
+
+
+async def publish_on_channel(
+    broker: RabbitBroker,
+    producer: ChannelProducer,
+    message: SendableMessage,
+    queue: str,
+    timeout: float | None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Публикация брокера, но через producer канала: так же применяются
+    middleware брокера (трассировка).
+    """
+    return await super(RabbitBroker, broker).publish(
+        message,
+        producer=producer,
+        routing_key=RabbitQueue.validate(queue).routing,
+        correlation_id=kwargs.pop("correlation_id", None) or gen_cor_id(),
+        app_id=broker.app_id,
+        timeout=timeout,
+        **kwargs,
+    )
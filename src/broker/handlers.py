@@ -1,19 +1,18 @@
-from typing import Any
+from collections.abc import Awaitable, Callable
 
-from dependency_injector.wiring import Provide, inject
+from celery import Celery
 
-from common.container import Container
 from schemas.order import OrderBrokerSchema
 
 
-@inject
-async def handle_new_order(
-    data: OrderBrokerSchema,
-    celery: Any = Provide[Container.celery],
-) -> None:
-    celery.send_task("process_new_order", args=[data.id])
+def create_broker_handlers(
+    celery: Celery,
+) -> dict[str, Callable[..., Awaitable[None]]]:
+    """Обработчики очередей Rabbit, зависимости привязываются один раз."""
 
+    async def handle_new_order(data: OrderBrokerSchema) -> None:
+        celery.send_task("process_new_order", args=[data.id, data.user_id])
 
-BROKER_HANDLERS = {
-    "new_order": handle_new_order,
-}
+    return {
+        "new_order": handle_new_order,
+    }
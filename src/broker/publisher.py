@@ -0,0 +1,146 @@
+"""Публикация сообщений в RabbitMQ через пул каналов."""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+from collections.abc import Iterator
+from typing import Any
+
+from faststream.rabbit import RabbitBroker
+from faststream.types import SendableMessage
+
+from broker.channels import (
+    ChannelProducer,
+    create_channel_producers,
+    publish_on_channel,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class BrokerPublisher:
+    """
+    Публикация сообщений с подтверждениями (publisher confirms).
+
+    Каналы берутся из пула по кругу. На канале публикации идут
+    конвейером: следующее сообщение отправляется, не дожидаясь
+    подтверждения предыдущего, и RabbitMQ подтверждает их пачкой
+    (ack multiple), поэтому одновременные публикации не ждут
+    подтверждения друг за другом.
+
+    enqueue и publish_nowait не ждут подтверждения: сообщение
+    попадает в ограниченную очередь, фоновые воркеры (по одному
+    на канал) публикуют её пачками до batch_size сообщений и ждут
+    подтверждения всей пачки. Заполненная очередь - обратное давление:
+    enqueue ждёт места, publish_nowait бросает asyncio.QueueFull.
+    Сообщения, не опубликованные из очереди, только логируются,
+    а при остановке очередь дописывается до drain_timeout секунд.
+    Сообщение из очереди публикуется в контексте (contextvars) того,
+    кто его поставил, чтобы не терялась трассировка запроса.
+    """
+
+    def __init__(
+        self,
+        broker: RabbitBroker,
+        channels: int = 4,
+        queue_size: int = 10_000,
+        batch_size: int = 100,
+        confirm_timeout: float | None = 10,
+        drain_timeout: float = 10,
+    ) -> None:
+        self.broker = broker
+        self.channels = channels
+        self.batch_size = batch_size
+        self.confirm_timeout = confirm_timeout
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue[
+            tuple[Any, str, dict[str, Any], contextvars.Context]
+        ] = asyncio.Queue(queue_size)
+        self._producers: list[ChannelProducer] = []
+        self._next_producer: Iterator[ChannelProducer] = iter(())
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Открывает каналы и запускает воркеры; брокер уже подключён."""
+        self._producers = await create_channel_producers(self.broker, self.channels)
+        self._next_producer = itertools.cycle(self._producers)
+        self._workers = [
+            asyncio.create_task(self._work(producer)) for producer in self._producers
+        ]
+
+    async def stop(self) -> None:
+        """Дописывает очередь и останавливает воркеры, до закрытия брокера."""
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except TimeoutError:
+            logger.warning(
+                "Publisher queue not drained, %d messages dropped",
+                self._queue.qsize(),
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def publish(
+        self, message: SendableMessage, queue: str, **kwargs: Any
+    ) -> Any:  # fmt: skip
+        """Публикует сообщение и ждёт подтверждения."""
+        if not self._producers:
+            raise RuntimeError("Publisher is not started")
+        return await self._publish(next(self._next_producer), message, queue, kwargs)
+
+    async def enqueue(
+        self, message: SendableMessage, queue: str, **kwargs: Any
+    ) -> None:
+        """Ставит сообщение в очередь публикации, ждёт только её места."""
+        await self._queue.put((message, queue, kwargs, contextvars.copy_context()))
+
+    def publish_nowait(
+        self, message: SendableMessage, queue: str, **kwargs: Any
+    ) -> None:
+        """Ставит сообщение в очередь публикации или бросает QueueFull."""
+        self._queue.put_nowait((message, queue, kwargs, contextvars.copy_context()))
+
+    async def _publish(
+        self,
+        producer: ChannelProducer,
+        message: SendableMessage,
+        queue: str,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        return await publish_on_channel(
+            self.broker,
+            producer,
+            message,
+            queue,
+            timeout=self.confirm_timeout,
+            **kwargs,
+        )
+
+    async def _work(self, producer: ChannelProducer) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            results = await asyncio.gather(
+                *(
+                    asyncio.create_task(
+                        self._publish(producer, message, queue, kwargs),
+                        context=context,
+                    )
+                    for message, queue, kwargs, context in batch
+                ),
+                return_exceptions=True,
+            )
+            for (_, queue, _, _), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Failed to publish message to %s",
+                        queue,
+                        exc_info=result,
+                    )
+                self._queue.task_done()
@@ -1,10 +1,36 @@
 import time
+from functools import cache
+from uuid import UUID
 
+from redis import Redis
 
-def process_new_order(order_id: int) -> None:
+from common.config import settings
+from schemas.enums.order import OrderEventTypeEnum
+from schemas.order import OrderEventSchema
+
+
+@cache
+def get_redis() -> Redis:
+    """Синхронный клиент Redis процесса воркера."""
+    return Redis(
+        host=settings.redis.REDIS_HOST,
+        port=settings.redis.REDIS_PORT,
+        password=settings.redis.REDIS_PASSWORD,
+    )
+
+
+def process_new_order(order_id: UUID, user_id: UUID | None = None) -> None:
     time.sleep(2)
     print(f"Order {order_id} processed!!!")
 
+    if user_id is not None:
+        event = OrderEventSchema(
+            event=OrderEventTypeEnum.PROCESSED, id=order_id, user_id=user_id
+        )
+        get_redis().publish(
+            settings.events.ORDER_EVENTS_CHANNEL, event.model_dump_json()
+        )
+
 
 CELERY_TASKS = [
     process_new_order,
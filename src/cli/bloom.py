@@ -0,0 +1,40 @@
+"""
+Заполнение Bloom фильтра id заказов.
+
+Нужно после включения ORDER_BLOOM_ENABLED, очистки Redis или массовой
+загрузки заказов в обход API. Пока фильтр не заполнен, он пропускает
+все запросы.
+
+Пример:
+    PYTHONPATH=src python -m cli.bloom rebuild
+"""
+
+import argparse
+import asyncio
+
+from common.container import Container
+
+
+async def rebuild(batch_size: int) -> None:
+    container = Container()
+    order_filter = container.order_bloom_filter()
+    total = 0
+    try:
+        for repository in container.order_repositories():
+            async for ids in repository.iter_ids(batch_size=batch_size):
+                total += await order_filter.add_many(ids)
+        await order_filter.mark_ready()
+    finally:
+        await container.order_shards().dispose()
+    print(f"Added {total} order ids")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.batch_size))
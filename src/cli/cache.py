@@ -0,0 +1,83 @@
+"""
+Обслуживание кэша заказов.
+
+train-dict - обучение словаря zstd для сжатия значений кэша. Словарь
+заметно улучшает сжатие небольших однотипных значений (заказов).
+Путь к файлу нужно указать в CACHE_COMPRESSION_DICT_PATH на всех
+процессах. Записи, сжатые другим словарём, процесс считает промахом кэша.
+
+warm-up - прогрев кэша get_order самыми частыми заказами (по учёту
+обращений), например после выкладки со сменой формата кэша.
+
+Пример:
+    PYTHONPATH=src python -m cli.cache train-dict --output order.zdict
+    PYTHONPATH=src python -m cli.cache warm-up --top 20000
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from common.container import Container
+from services.utils.compression import zstandard
+
+
+async def train_dict(samples: int, dict_size: int, output: Path) -> None:
+    if zstandard is None:
+        raise SystemExit("zstandard is not installed")
+
+    container = Container()
+    repositories = container.order_repositories()
+    # Примерно поровну с каждого шарда.
+    limit = -(-samples // len(repositories))
+    try:
+        results = await repositories.fan_out(
+            lambda repository: repository.get_sample(limit)
+        )
+    finally:
+        await container.order_shards().dispose()
+    orders = [order for shard_orders in results for order in shard_orders]
+
+    # Обучаем на несжатом JSON - том же, что пишется в кэш.
+    data = [order.model_dump_json().encode() for order in orders]
+    dictionary = zstandard.train_dictionary(dict_size, data)
+    output.write_bytes(dictionary.as_bytes())
+
+    compressor = zstandard.ZstdCompressor(dict_data=dictionary)
+    raw = sum(len(item) for item in data)
+    compressed = sum(len(compressor.compress(item)) for item in data)
+    print(
+        f"Trained on {len(data)} orders, saved to {output}; "
+        f"sample ratio {raw / compressed:.2f}"
+    )
+
+
+async def warm_up(top: int | None) -> None:
+    container = Container()
+    service = container.order_cache_warmup_service()
+    if top is not None:
+        service.top = top
+    try:
+        warmed = await service.warm_up()
+    finally:
+        await container.order_shards().dispose()
+    print(f"Warmed up {warmed} orders")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=["train-dict", "warm-up"])
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--dict-size", type=int, default=16 * 1024)
+    parser.add_argument("--output", type=Path, default=Path("order.zdict"))
+    parser.add_argument(
+        "--top", type=int, default=None, help="По умолчанию CACHE_WARMUP_TOP"
+    )
+    args = parser.parse_args()
+    if args.command == "warm-up":
+        asyncio.run(warm_up(args.top))
+    else:
+        asyncio.run(train_dict(args.samples, args.dict_size, args.output))
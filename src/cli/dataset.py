@@ -0,0 +1,283 @@
+"""
+Массовая загрузка пользователей и заказов через COPY FROM STDIN.
+
+Генерация синтетических данных сразу в БД (4 процесса):
+    PYTHONPATH=src python -m cli.dataset generate --users 1000000 \\
+        --orders-per-user 10 --distribution pareto --items-size 1024 --jobs 4
+
+Генерация в CSV и последующая загрузка:
+    PYTHONPATH=src python -m cli.dataset generate --users 1000 --output data/
+    PYTHONPATH=src python -m cli.dataset load \\
+        --users data/users-*.csv --orders data/orders-*.csv
+
+Поддерживаются CSV с заголовком и NDJSON (по расширению .ndjson/.jsonl).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from datetime import UTC, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from common.container import Container
+from repositories.bulk import BulkLoadRepository
+from repositories.sharding import ShardedRepository
+from services.dataset import (
+    ORDER_COLUMNS,
+    USER_COLUMNS,
+    DatasetConfig,
+    OrdersDistributionEnum,
+    generate,
+)
+
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+USER_ID_INDEX = ORDER_COLUMNS.index("user_id")
+
+# Преобразование полей NDJSON в типы, которые ждёт бинарный COPY asyncpg.
+COLUMN_PARSERS: dict[str, Callable[[Any], Any]] = {
+    "id": UUID,
+    "user_id": UUID,
+    "created_at": datetime.fromisoformat,
+    "updated_at": datetime.fromisoformat,
+    "total_price": float,
+    "items": lambda value: value if isinstance(value, str) else json.dumps(value),
+}
+
+
+def read_ndjson(path: Path, columns: Sequence[str]) -> Iterator[tuple[Any, ...]]:
+    """Читает NDJSON построчно и возвращает кортежи в порядке columns."""
+    with path.open() as file:
+        for line in file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            yield tuple(
+                COLUMN_PARSERS.get(column, str)(row[column]) for column in columns
+            )
+
+
+def read_csv(path: Path, columns: Sequence[str]) -> Iterator[tuple[Any, ...]]:
+    """Читает CSV с заголовком и возвращает кортежи в порядке columns."""
+    with path.open(newline="") as file:
+        for row in csv.DictReader(file):
+            yield tuple(
+                COLUMN_PARSERS.get(column, str)(row[column]) for column in columns
+            )
+
+
+async def copy_orders(
+    repositories: ShardedRepository[BulkLoadRepository],
+    records: Iterable[tuple[Any, ...]],
+) -> None:
+    """Загружает заказы на шарды их пользователей."""
+    groups: dict[int, list[tuple[Any, ...]]] = {}
+    for record in records:
+        index = repositories.shards.get_index(record[USER_ID_INDEX])
+        groups.setdefault(index, []).append(record)
+    await asyncio.gather(
+        *(
+            repositories.repositories[index].copy_records(
+                "order", ORDER_COLUMNS, shard_records
+            )
+            for index, shard_records in groups.items()
+        )
+    )
+
+
+async def load_orders_file(
+    repositories: ShardedRepository[BulkLoadRepository],
+    path: Path,
+    batch_size: int = 50_000,
+) -> None:
+    if len(repositories) == 1:
+        await load_file(next(iter(repositories)), "order", ORDER_COLUMNS, path)
+        return
+
+    # Шард выбирается по user_id, поэтому строки разбираются в Python.
+    reader = read_ndjson if path.suffix in NDJSON_SUFFIXES else read_csv
+    rows, total = reader(path, ORDER_COLUMNS), 0
+    while batch := list(islice(rows, batch_size)):
+        await copy_orders(repositories, batch)
+        total += len(batch)
+    print(f"{path}: COPY {total}")
+
+
+async def load_file(
+    repository: BulkLoadRepository,
+    table: str,
+    columns: Sequence[str],
+    path: Path,
+) -> None:
+    if path.suffix in NDJSON_SUFFIXES:
+        result = await repository.copy_records(
+            table, columns, read_ndjson(path, columns)
+        )
+    else:
+        with path.open() as file:
+            header = next(csv.reader(file))
+        result = await repository.copy_csv(table, header, path)
+    print(f"{path}: {result}")
+
+
+async def load(args: argparse.Namespace) -> None:
+    container = Container()
+    repository = container.bulk_load_repository()
+    order_repositories = container.order_bulk_load_repositories()
+    try:
+        # Пользователи первыми из-за внешнего ключа заказов (без шардов).
+        for path in args.users:
+            await load_file(repository, "user", USER_COLUMNS, path)
+        for path in args.orders:
+            await load_orders_file(order_repositories, path)
+    finally:
+        await container.db().dispose()
+        await container.order_shards().dispose()
+
+
+async def load_part(
+    config: DatasetConfig, part: int, parts: int, batch_size: int
+) -> int:
+    container = Container()
+    repository = container.bulk_load_repository()
+    order_repositories = container.order_bulk_load_repositories()
+    users: list[tuple[Any, ...]] = []
+    orders: list[tuple[Any, ...]] = []
+    total = 0
+
+    async def flush() -> None:
+        await repository.copy_records("user", USER_COLUMNS, users)
+        await copy_orders(order_repositories, orders)
+        users.clear()
+        orders.clear()
+
+    try:
+        for user, user_orders in generate(config, part, parts):
+            users.append(user)
+            orders.extend(user_orders)
+            total += len(user_orders)
+            if len(orders) >= batch_size:
+                await flush()
+        await flush()
+    finally:
+        await container.db().dispose()
+        await container.order_shards().dispose()
+    return total
+
+
+def write_part(config: DatasetConfig, part: int, parts: int, output: Path) -> int:
+    total = 0
+    with (
+        (output / f"users-{part}.csv").open("w", newline="") as users_file,
+        (output / f"orders-{part}.csv").open("w", newline="") as orders_file,
+    ):
+        users = csv.writer(users_file)
+        orders = csv.writer(orders_file)
+        users.writerow(USER_COLUMNS)
+        orders.writerow(ORDER_COLUMNS)
+        for user, user_orders in generate(config, part, parts):
+            users.writerow(user)
+            orders.writerows(user_orders)
+            total += len(user_orders)
+    return total
+
+
+def run_part(
+    config: DatasetConfig,
+    part: int,
+    parts: int,
+    batch_size: int,
+    output: Path | None,
+) -> int:
+    if output:
+        return write_part(config, part, parts, output)
+    return asyncio.run(load_part(config, part, parts, batch_size))
+
+
+async def ensure_partitions(months: int) -> None:
+    container = Container()
+    service = container.partition_service()
+    try:
+        await service.ensure_partitions_from(
+            datetime.now(tz=UTC).date() - timedelta(days=30 * months + 31)
+        )
+    finally:
+        await container.db().dispose()
+        await container.order_shards().dispose()
+
+
+def generate_dataset(args: argparse.Namespace) -> None:
+    config = DatasetConfig(
+        users=args.users,
+        orders_per_user=args.orders_per_user,
+        distribution=args.distribution,
+        items_size=args.items_size,
+        months=args.months,
+        seed=args.seed,
+    )
+    if args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+    else:
+        # Без партиции месяца вставка заказов за него упадёт.
+        asyncio.run(ensure_partitions(args.months))
+
+    started = time.monotonic()
+    parts = [
+        (config, part, args.jobs, args.batch_size, args.output)
+        for part in range(args.jobs)
+    ]
+    with multiprocessing.get_context("spawn").Pool(args.jobs) as pool:
+        total = sum(pool.starmap(run_part, parts))
+
+    elapsed = time.monotonic() - started
+    print(
+        f"{config.users} users, {total} orders in {elapsed:.1f}s "
+        f"({total / elapsed:.0f} orders/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate")
+    generate_parser.add_argument("--users", type=int, required=True)
+    generate_parser.add_argument("--orders-per-user", type=float, default=10)
+    generate_parser.add_argument(
+        "--distribution",
+        type=OrdersDistributionEnum,
+        default=OrdersDistributionEnum.POISSON,
+        choices=list(OrdersDistributionEnum),
+    )
+    generate_parser.add_argument(
+        "--items-size", type=int, default=512, help="Размер items в байтах"
+    )
+    generate_parser.add_argument(
+        "--months", type=int, default=12, help="За сколько месяцев заказы"
+    )
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--jobs", type=int, default=1)
+    generate_parser.add_argument("--batch-size", type=int, default=50_000)
+    generate_parser.add_argument(
+        "--output", type=Path, help="Каталог для CSV вместо загрузки в БД"
+    )
+
+    load_parser = subparsers.add_parser("load")
+    load_parser.add_argument("--users", type=Path, nargs="*", default=[])
+    load_parser.add_argument("--orders", type=Path, nargs="*", default=[])
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate_dataset(args)
+    else:
+        asyncio.run(load(args))
@@ -0,0 +1,51 @@
+"""
+Потоковая выгрузка заказов в файл или stdout.
+
+Пример:
+    PYTHONPATH=src python -m cli.export_orders --format ndjson --gzip \\
+        --from 2025-01-01 --to 2025-02-01 --output orders.ndjson.gz
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from uuid import UUID
+
+from common.container import Container
+from schemas.enums.export import ExportFormatEnum
+
+
+async def main(args: argparse.Namespace) -> None:
+    container = Container()
+    service = container.export_service()
+
+    stream = service.export_orders(
+        args.format,
+        compress=args.gzip,
+        user_id=args.user_id,
+        created_from=args.created_from,
+        created_to=args.created_to,
+    )
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in stream:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        await container.order_shards().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--format", type=ExportFormatEnum, default=ExportFormatEnum.CSV)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--from", dest="created_from", type=datetime.fromisoformat)
+    parser.add_argument("--to", dest="created_to", type=datetime.fromisoformat)
+    parser.add_argument("--output", help="Файл для выгрузки, по умолчанию stdout")
+    asyncio.run(main(parser.parse_args()))
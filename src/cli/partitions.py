@@ -0,0 +1,42 @@
+"""
+Обслуживание партиций заказов.
+
+Пример:
+    PYTHONPATH=src python -m cli.partitions ensure
+    PYTHONPATH=src python -m cli.partitions archive
+"""
+
+import argparse
+import asyncio
+
+from common.container import Container
+
+
+async def main(command: str) -> None:
+    container = Container()
+    service = container.partition_service()
+
+    try:
+        if command == "ensure":
+            print(await service.ensure_partitions())
+        elif command == "archive":
+            print(await service.archive_partitions())
+        else:
+            await service.maintain()
+    finally:
+        await container.order_shards().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["ensure", "archive", "maintain"],
+        default="maintain",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.command))
@@ -0,0 +1,33 @@
+"""
+Подпись заголовка X-Profile для профилирования одного запроса.
+
+Профиль запроса сохраняется в PROFILING_DIR в формате speedscope
+(https://www.speedscope.app), имя файла - в заголовке ответа X-Profile-Id.
+
+Пример:
+    PYTHONPATH=src python -m cli.profiling sign /orders/<order_id> --ttl 300
+"""
+
+import argparse
+import time
+
+from common.config import settings
+from middlewares.profiling import PROFILE_HEADER, sign_profile_request
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=["sign"])
+    parser.add_argument("path", help="Путь запроса без query string")
+    parser.add_argument("--ttl", type=int, default=300, help="Секунд действия")
+    args = parser.parse_args()
+
+    secret = settings.profiling.PROFILING_SECRET
+    if not secret:
+        raise SystemExit("PROFILING_SECRET is not set")
+    expires = int(time.time()) + args.ttl
+    value = sign_profile_request(secret, args.path, expires)
+    print(f"{PROFILE_HEADER}: {value}")
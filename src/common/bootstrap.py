@@ -1,33 +1,95 @@
-from collections.abc import AsyncIterator
+import asyncio
+from collections.abc import AsyncIterator, Sequence
 from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import FastAPI
 from faststream.rabbit.fastapi import RabbitBroker, RabbitRouter
 from starlette.middleware.cors import CORSMiddleware
 
+from api.admin import router as admin_router
+from api.dependencies import bind_services
+from api.health import router as health_router
 from api.routes import router as api_router
-from broker.handlers import BROKER_HANDLERS
+from broker.handlers import create_broker_handlers
 from celery_.tasks import CELERY_TASKS
 from common.application import App
 from common.config import settings
 from common.container import Container
+from common.periodic import PeriodicTasks
+from common.tracing import broker_middlewares, instrument_app, setup_tracing
+from middlewares.compression import CompressionMiddleware
+from middlewares.idempotency import IdempotencyMiddleware
+from middlewares.load_shedding import LoadSheddingMiddleware
+from middlewares.profiling import ProfilingMiddleware
+from middlewares.rate_limit import RateLimitMiddleware
+from middlewares.request_context import RequestContextMiddleware
+from middlewares.unit_of_work import UnitOfWorkMiddleware
+
+
+async def warm_up(app: App) -> None:
+    """Прогрев перед готовностью к трафику."""
+    if settings.warmup.WARMUP_ENABLED:
+        await app.container.warmup_service().run()
+    app.state.ready = True
+
+
+async def start_publisher(app: App) -> None:
+    # После подключения брокера: каналы открываются на его соединении.
+    await app.container.broker_publisher().start()
+
+
+async def stop_publisher(app: App) -> None:
+    # До закрытия брокера, чтобы дописать очередь публикации.
+    await app.container.broker_publisher().stop()
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+async def lifespan(app: App) -> AsyncIterator[None]:
     print("The app is on")
+
+    periodic = PeriodicTasks()
+    periodic.add(
+        "order_partitions",
+        app.container.partition_service().maintain,
+        settings.partition.ORDER_PARTITION_MAINTENANCE_INTERVAL,
+    )
+    if settings.expiry.ORDER_EXPIRY_ENABLED:
+        periodic.add(
+            "order_expiry",
+            app.container.order_expiry_service().expire,
+            settings.expiry.ORDER_EXPIRY_INTERVAL,
+        )
+    if settings.cache.CACHE_WARMUP_ENABLED:
+        periodic.add(
+            "order_cache_warmup",
+            app.container.order_cache_warmup_service().maintain,
+            settings.cache.CACHE_WARMUP_INTERVAL,
+        )
+    periodic.start()
+
+    app.state.ready = False
+    warmup_task = asyncio.create_task(warm_up(app))
+
     yield
+
+    # Балансировщик перестаёт слать трафик до закрытия соединений.
+    app.state.ready = False
+    warmup_task.cancel()
+    await periodic.stop()
+    await app.container.order_event_hub().stop()
     print("The app is off")
 
 
-async def init_container() -> Container:
+async def init_container(broker_middlewares: Sequence[Any] = ()) -> Container:
     """Инициализация контейнера DI."""
 
     router = RabbitRouter(
         url=settings.rabbit.url,
         lifespan=lifespan,
     )
-    router.broker = RabbitBroker(settings.rabbit.url)
+    router.broker = RabbitBroker(settings.rabbit.url, middlewares=broker_middlewares)
+    router.after_startup(start_publisher)
+    router.on_broker_shutdown(stop_publisher)
 
     container = Container(rabbit_router=router, rabbit_broker=router.broker)
 
@@ -41,10 +103,17 @@ async def init_container() -> Container:
 
 async def create_app() -> App:
     """Формирование app для запуска."""
-    container = await init_container()
+    tracer_provider = setup_tracing(settings.tracing)
+    container = await init_container(broker_middlewares(tracer_provider))
 
     app = App()
     app.container = container
+    bind_services(app, container)
+    instrument_app(
+        app,
+        [container.db().engine, *(db.engine for db in container.order_shards())],
+        tracer_provider,
+    )
 
     # Celery
     celery = container.celery()
@@ -56,11 +125,66 @@ async def create_app() -> App:
     rabbit_router = container.rabbit_router()
     rabbit_broker = container.rabbit_broker()
     # Регистрация обработчиков Rabbit
-    for queue, func in BROKER_HANDLERS.items():
+    for queue, func in create_broker_handlers(celery).items():
         rabbit_broker.subscriber(queue)(func)
 
     app.include_router(rabbit_router)
     app.include_router(api_router)
+    app.include_router(admin_router)
+    app.include_router(health_router)
+
+    app.add_middleware(UnitOfWorkMiddleware)
+
+    # Снаружи единицы работы: сохраняется ответ после коммита.
+    idempotency = settings.idempotency
+    if idempotency.IDEMPOTENCY_ENABLED:
+        app.add_middleware(
+            IdempotencyMiddleware,
+            redis=container.redis(),
+            routes=idempotency.IDEMPOTENCY_ROUTES,
+            ttl=idempotency.IDEMPOTENCY_TTL,
+            lock_ttl=idempotency.IDEMPOTENCY_LOCK_TTL,
+            wait_timeout=idempotency.IDEMPOTENCY_WAIT_TIMEOUT,
+        )
+
+    if settings.app.RESPONSE_COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.app.RESPONSE_COMPRESSION_MINIMUM_SIZE,
+        )
+
+    profiling = settings.profiling
+    if profiling.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            output_dir=profiling.PROFILING_DIR,
+            secret=profiling.PROFILING_SECRET,
+            sample_rate=profiling.PROFILING_SAMPLE_RATE,
+            interval=profiling.PROFILING_INTERVAL,
+        )
+
+    load_shedding = settings.load_shedding
+    if load_shedding.LOAD_SHEDDING_ENABLED:
+        app.add_middleware(
+            LoadSheddingMiddleware,
+            route_classes=load_shedding.LOAD_SHEDDING_ROUTE_CLASSES,
+            initial_limit=load_shedding.LOAD_SHEDDING_INITIAL_LIMIT,
+            min_limit=load_shedding.LOAD_SHEDDING_MIN_LIMIT,
+            max_limit=load_shedding.LOAD_SHEDDING_MAX_LIMIT,
+            latency_target=load_shedding.LOAD_SHEDDING_LATENCY_TARGET,
+            backoff=load_shedding.LOAD_SHEDDING_BACKOFF,
+            retry_after=load_shedding.LOAD_SHEDDING_RETRY_AFTER,
+        )
+    if load_shedding.RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            redis=container.redis(),
+            rate=load_shedding.RATE_LIMIT_RATE,
+            burst=load_shedding.RATE_LIMIT_BURST,
+            prefixes=tuple(load_shedding.LOAD_SHEDDING_ROUTE_CLASSES),
+        )
+
+    app.add_middleware(RequestContextMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -18,6 +20,42 @@ class AppSettings(EnvSettings):
     CORS_ALLOW_ORIGINS: list[str] = ["http://localhost:8080", "http://127.0.0.1:8080"]
     CORS_ALLOW_METHODS: list[str] = ["*"]
     CORS_ALLOW_HEADERS: list[str] = ["*"]
+    # Сжатие ответов gzip/zstd по Accept-Encoding.
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+
+
+class LoadSheddingSettings(EnvSettings):
+    """Настройки ограничения нагрузки."""
+
+    LOAD_SHEDDING_ENABLED: bool = True
+    # Префикс пути -> класс маршрутов со своим лимитом конкурентности.
+    LOAD_SHEDDING_ROUTE_CLASSES: dict[str, str] = {
+        "/orders": "orders",
+        "/token": "auth",
+        "/register": "auth",
+    }
+    LOAD_SHEDDING_INITIAL_LIMIT: int = 20
+    LOAD_SHEDDING_MIN_LIMIT: int = 2
+    LOAD_SHEDDING_MAX_LIMIT: int = 200
+    LOAD_SHEDDING_LATENCY_TARGET: float = 0.25  # seconds
+    LOAD_SHEDDING_BACKOFF: float = 0.9
+    LOAD_SHEDDING_RETRY_AFTER: int = 1  # seconds
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RATE: float = 20  # tokens per second
+    RATE_LIMIT_BURST: int = 40
+
+
+class IdempotencySettings(EnvSettings):
+    """Заголовок Idempotency-Key."""
+
+    IDEMPOTENCY_ENABLED: bool = True
+    # "METHOD path" маршрутов, для которых поддерживается заголовок.
+    IDEMPOTENCY_ROUTES: list[str] = ["POST /orders/"]
+    IDEMPOTENCY_TTL: int = 86400  # seconds, хранение ответа
+    IDEMPOTENCY_LOCK_TTL: int = 30  # seconds, больше времени запроса
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10  # seconds
 
 
 class RedisSettings(EnvSettings):
@@ -25,11 +63,57 @@ class RedisSettings(EnvSettings):
     REDIS_PORT: int
     REDIS_PASSWORD: str = ""
     REDIS_BLOCKING_TIMEOUT: float = 1.5  # seconds
+    # standalone - REDIS_HOST:REDIS_PORT; cluster - Redis Cluster
+    # (стартовые узлы REDIS_NODES); sharded - консистентное хэширование
+    # ключей кэша по узлам REDIS_NODES ["host:port", ...].
+    # Pub/sub всегда идёт через REDIS_HOST:REDIS_PORT.
+    REDIS_MODE: Literal["standalone", "cluster", "sharded"] = "standalone"
+    REDIS_NODES: list[str] = []
+
+
+class CacheSettings(EnvSettings):
+    """Настройки кэша."""
+
+    CACHE_NEGATIVE_TTL: int = 30  # seconds, 0 - не кэшировать 404
+    ORDER_BLOOM_ENABLED: bool = False
+    ORDER_BLOOM_CAPACITY: int = 10_000_000
+    ORDER_BLOOM_ERROR_RATE: float = 0.001
+    # Сжатие значений кэша. Включать после выкладки кода, читающего
+    # сжатые записи, на все процессы.
+    CACHE_COMPRESSION_ENABLED: bool = False
+    CACHE_COMPRESSION_THRESHOLD: int = 1024  # bytes
+    CACHE_COMPRESSION_LEVEL: int = 3
+    # Словарь zstd, обученный командой `python -m cli.cache train-dict`.
+    CACHE_COMPRESSION_DICT_PATH: str = ""
+    # Учёт частоты обращений к кэшу get_order: доля учитываемых
+    # обращений (0 - не учитывать) и сколько самых частых ключей хранить.
+    CACHE_ACCESS_SAMPLE_RATE: float = 0.01
+    CACHE_ACCESS_MAX_KEYS: int = 100_000
+    # Счётчики умножаются на CACHE_ACCESS_DECAY раз в интервал.
+    CACHE_ACCESS_DECAY: float = 0.5
+    CACHE_ACCESS_DECAY_INTERVAL: int = 3600  # seconds
+    # Прогрев кэша самыми частыми заказами после очистки Redis.
+    CACHE_WARMUP_ENABLED: bool = True
+    CACHE_WARMUP_INTERVAL: int = 60  # seconds
+    CACHE_WARMUP_TOP: int = 10_000
+    CACHE_WARMUP_CHUNK_SIZE: int = 500
+    CACHE_WARMUP_RATE: float = 5000  # orders per second
+
+
+class EventsSettings(EnvSettings):
+    """Настройки push-уведомлений о заказах (SSE)."""
+
+    ORDER_EVENTS_CHANNEL: str = "order_events"
+    ORDER_EVENTS_HEARTBEAT: float = 15  # seconds
+    # Необработанных событий на одно подключение, старые вытесняются.
+    ORDER_EVENTS_QUEUE_SIZE: int = 16
 
 
 class AuthSettings(EnvSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Токен для служебных эндпоинтов /admin/, пустой - эндпоинты недоступны.
+    ADMIN_TOKEN: str = ""
 
 
 class DatabaseSettings(EnvSettings):
@@ -40,6 +124,20 @@ class DatabaseSettings(EnvSettings):
     DB_HOST: str
     DB_PORT: int
     DB_NAME: str
+    # Объединение get_by в пакетные запросы: None - выключено,
+    # 0 - ключи одного тика event loop, больше 0 - окно в секундах.
+    DB_BATCH_WINDOW: float | None = None
+    # Запросы дольше порога пишутся в журнал, None - выключено.
+    DB_SLOW_QUERY_THRESHOLD: float | None = None  # seconds
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    # Подготовленных выражений asyncpg на соединение.
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    # URL БД шардов заказов (postgresql+asyncpg://...), пусто - заказы
+    # в основной БД. Порядок задаёт распределение пользователей по
+    # шардам: новые шарды - только в конец. Пользователи всегда в
+    # основной БД.
+    DB_ORDER_SHARDS: list[str] = []
 
     @computed_field(return_type=str)
     @property
@@ -52,6 +150,67 @@ class DatabaseSettings(EnvSettings):
         )
 
 
+class ProfilingSettings(EnvSettings):
+    """Профилирование отдельных запросов."""
+
+    PROFILING_ENABLED: bool = False
+    # Ключ подписи заголовка X-Profile, пустой - профилирование по
+    # заголовку недоступно.
+    PROFILING_SECRET: str = ""
+    # Доля случайных запросов, которые профилируются без заголовка.
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL: float = 0.001  # seconds
+    PROFILING_DIR: str = "profiles"
+
+
+class WarmupSettings(EnvSettings):
+    """Прогрев соединений при старте, до готовности (/health/ready)."""
+
+    WARMUP_ENABLED: bool = True
+    # Не больше DB_POOL_SIZE, иначе лишние соединения закроются.
+    WARMUP_DB_CONNECTIONS: int = 5
+    WARMUP_REDIS_CONNECTIONS: int = 5
+    WARMUP_RETRY_INTERVAL: float = 2  # seconds
+    WARMUP_BROKER_TIMEOUT: float = 5  # seconds
+
+
+class TracingSettings(EnvSettings):
+    """Трассировка OpenTelemetry."""
+
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "orders-api"
+    # otlp - коллектор по OTLP/HTTP, file - JSON строки в TRACING_FILE.
+    TRACING_EXPORTER: Literal["otlp", "file"] = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE: str = "traces/spans.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
+
+
+class PartitionSettings(EnvSettings):
+    """Настройки партиционирования таблицы заказов."""
+
+    ORDER_PARTITION_MONTHS_AHEAD: int = 3
+    ORDER_PARTITION_MAINTENANCE_INTERVAL: int = 3600  # seconds
+    ORDER_ARCHIVE_AFTER_MONTHS: int = 12
+    # Пустое значение - партиция отсоединяется и переносится в схему archive,
+    # иначе переносится в указанное tablespace.
+    ORDER_ARCHIVE_TABLESPACE: str = ""
+    ORDER_ARCHIVE_SCHEMA: str = "archive"
+
+
+class OrderExpirySettings(EnvSettings):
+    """Настройки отмены зависших заказов в статусе pending."""
+
+    ORDER_EXPIRY_ENABLED: bool = True
+    # Заказ в статусе pending старше этого возраста отменяется.
+    ORDER_PENDING_TTL: int = 86400  # seconds
+    ORDER_EXPIRY_INTERVAL: int = 300  # seconds
+    # Заказов в одной транзакции и транзакций за один запуск на шард.
+    ORDER_EXPIRY_BATCH_SIZE: int = 500
+    ORDER_EXPIRY_MAX_BATCHES: int = 20
+    ORDER_EXPIRY_BATCH_PAUSE: float = 0.1  # seconds
+
+
 class RabbitSettings(EnvSettings):
     """Настройки Rabbit."""
 
@@ -59,6 +218,13 @@ class RabbitSettings(EnvSettings):
     RABBIT_PASSWORD: str
     RABBIT_HOST: str
     RABBIT_PORT: int
+    # Пул каналов публикации и очередь публикации без ожидания.
+    RABBIT_PUBLISHER_CHANNELS: int = 4
+    RABBIT_PUBLISHER_QUEUE_SIZE: int = 10_000
+    RABBIT_PUBLISHER_BATCH_SIZE: int = 100
+    RABBIT_PUBLISHER_CONFIRM_TIMEOUT: float = 10  # seconds
+    # Сколько при остановке дописывать очередь.
+    RABBIT_PUBLISHER_DRAIN_TIMEOUT: float = 10  # seconds
 
     @computed_field(return_type=str)
     @property
@@ -72,9 +238,18 @@ class RabbitSettings(EnvSettings):
 
 class Settings(BaseSettings):
     app: AppSettings = AppSettings()
+    load_shedding: LoadSheddingSettings = LoadSheddingSettings()
+    idempotency: IdempotencySettings = IdempotencySettings()
     redis: RedisSettings = RedisSettings()
+    cache: CacheSettings = CacheSettings()
+    events: EventsSettings = EventsSettings()
     auth: AuthSettings = AuthSettings()
     db: DatabaseSettings = DatabaseSettings()
+    profiling: ProfilingSettings = ProfilingSettings()
+    tracing: TracingSettings = TracingSettings()
+    warmup: WarmupSettings = WarmupSettings()
+    partition: PartitionSettings = PartitionSettings()
+    expiry: OrderExpirySettings = OrderExpirySettings()
     rabbit: RabbitSettings = RabbitSettings()
 
 
@@ -6,16 +6,33 @@ from faststream.rabbit import RabbitBroker
 from faststream.rabbit.fastapi import RabbitRouter
 from redis.asyncio import Redis
 
+from broker.publisher import BrokerPublisher
 from common.config import Settings, settings
+from common.redis import create_redis
 from models.order import Order
 from models.user import User
+from repositories.bulk import BulkLoadRepository
 from repositories.db import Database
+from repositories.export import OrderExportRepository
+from repositories.partitions import OrderPartitionRepository
 from repositories.repositories import OrderRepository, UserRepository
+from repositories.sharding import (
+    DatabaseShards,
+    ShardedRepository,
+    create_order_shards,
+)
 from schemas.order import OrderDbSchema
 from schemas.user import UserDbSchema
 from services.auth import AuthService
+from services.cache_warmup import OrderCacheWarmupService
+from services.events import OrderEventHub
+from services.expiry import OrderExpiryService
+from services.export import ExportService
 from services.order import OrderService
+from services.partitions import PartitionService
 from services.user import UserService
+from services.utils.bloom import RedisBloomFilter
+from services.warmup import WarmupService
 
 
 class Container(containers.DeclarativeContainer):
@@ -25,22 +42,40 @@ class Container(containers.DeclarativeContainer):
 
     config = providers.Configuration(pydantic_settings=[Settings()])
 
-    wiring_config = containers.WiringConfiguration(
-        modules=[
-            "services.utils.cache",
-        ],
-        packages=["api", "broker"],
-    )
-
     # -------------------------------------------------------------------------
 
     # кэш
     redis: providers.Provider[Redis] = providers.Singleton(
+        create_redis,
+        mode=config.redis.REDIS_MODE,
+        host=config.redis.REDIS_HOST,
+        port=config.redis.REDIS_PORT,
+        password=config.redis.REDIS_PASSWORD,
+        nodes=config.redis.REDIS_NODES,
+    )
+    # Pub/sub - отдельный клиент одного узла: в кластере сообщения
+    # расходятся по всем узлам, при шардировании узел выбран явно.
+    redis_pubsub: providers.Provider[Redis] = providers.Singleton(
         Redis,
         host=config.redis.REDIS_HOST,
         port=config.redis.REDIS_PORT,
         password=config.redis.REDIS_PASSWORD,
     )
+    order_bloom_filter: providers.Provider[RedisBloomFilter] = providers.Singleton(
+        RedisBloomFilter,
+        redis=redis,
+        # Фильтр и его отметка ready - в одном слоте.
+        key="{bloom:order}",
+        capacity=config.cache.ORDER_BLOOM_CAPACITY,
+        error_rate=config.cache.ORDER_BLOOM_ERROR_RATE,
+        enabled=config.cache.ORDER_BLOOM_ENABLED,
+    )
+    order_event_hub: providers.Provider[OrderEventHub] = providers.Singleton(
+        OrderEventHub,
+        redis=redis_pubsub,
+        channel=config.events.ORDER_EVENTS_CHANNEL,
+        queue_size=config.events.ORDER_EVENTS_QUEUE_SIZE,
+    )
 
     # -------------------------------------------------------------------------
 
@@ -56,6 +91,15 @@ class Container(containers.DeclarativeContainer):
     rabbit_broker: providers.Provider[RabbitBroker] = providers.Dependency(
         instance_of=RabbitBroker,
     )
+    broker_publisher: providers.Provider[BrokerPublisher] = providers.Singleton(
+        BrokerPublisher,
+        broker=rabbit_broker,
+        channels=config.rabbit.RABBIT_PUBLISHER_CHANNELS,
+        queue_size=config.rabbit.RABBIT_PUBLISHER_QUEUE_SIZE,
+        batch_size=config.rabbit.RABBIT_PUBLISHER_BATCH_SIZE,
+        confirm_timeout=config.rabbit.RABBIT_PUBLISHER_CONFIRM_TIMEOUT,
+        drain_timeout=config.rabbit.RABBIT_PUBLISHER_DRAIN_TIMEOUT,
+    )
 
     # -------------------------------------------------------------------------
 
@@ -64,6 +108,20 @@ class Container(containers.DeclarativeContainer):
     db: providers.Provider[Database] = providers.Singleton(
         Database,
         db_url=config.db.url,
+        slow_query_threshold=config.db.DB_SLOW_QUERY_THRESHOLD,
+        pool_size=config.db.DB_POOL_SIZE,
+        max_overflow=config.db.DB_MAX_OVERFLOW,
+        prepared_statement_cache_size=config.db.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    )
+    # БД с заказами: шарды или основная БД.
+    order_shards: providers.Provider[DatabaseShards] = providers.Singleton(
+        create_order_shards,
+        default=db,
+        urls=config.db.DB_ORDER_SHARDS,
+        slow_query_threshold=config.db.DB_SLOW_QUERY_THRESHOLD,
+        pool_size=config.db.DB_POOL_SIZE,
+        max_overflow=config.db.DB_MAX_OVERFLOW,
+        prepared_statement_cache_size=config.db.DB_PREPARED_STATEMENT_CACHE_SIZE,
     )
 
     user_repository: providers.Provider[UserRepository] = providers.Singleton(
@@ -71,13 +129,48 @@ class Container(containers.DeclarativeContainer):
         session_factory=db.provided.session,
         model=User,
         model_schema=UserDbSchema,
+        batch_window=config.db.DB_BATCH_WINDOW,
+    )
+
+    order_repositories: providers.Provider[ShardedRepository[OrderRepository]] = (
+        providers.Singleton(
+            ShardedRepository,
+            shards=order_shards,
+            factory=providers.Factory(
+                OrderRepository,
+                model=Order,
+                model_schema=OrderDbSchema,
+                batch_window=config.db.DB_BATCH_WINDOW,
+            ).provider,
+        )
+    )
+
+    order_partition_repositories: providers.Provider[
+        ShardedRepository[OrderPartitionRepository]
+    ] = providers.Singleton(
+        ShardedRepository,
+        shards=order_shards,
+        factory=providers.Factory(OrderPartitionRepository).provider,
     )
 
-    order_repository: providers.Provider[UserRepository] = providers.Singleton(
-        OrderRepository,
+    order_export_repositories: providers.Provider[
+        ShardedRepository[OrderExportRepository]
+    ] = providers.Singleton(
+        ShardedRepository,
+        shards=order_shards,
+        factory=providers.Factory(OrderExportRepository).provider,
+    )
+
+    bulk_load_repository: providers.Provider[BulkLoadRepository] = providers.Singleton(
+        BulkLoadRepository,
         session_factory=db.provided.session,
-        model=Order,
-        model_schema=OrderDbSchema,
+    )
+    order_bulk_load_repositories: providers.Provider[
+        ShardedRepository[BulkLoadRepository]
+    ] = providers.Singleton(
+        ShardedRepository,
+        shards=order_shards,
+        factory=providers.Factory(BulkLoadRepository).provider,
     )
 
     # -------------------------------------------------------------------------
@@ -85,12 +178,64 @@ class Container(containers.DeclarativeContainer):
     # Сервисы
 
     auth_service: providers.Provider[AuthService] = providers.Singleton(AuthService)
-    user_service: providers.Provider[UserService] = providers.Factory(
+    # Сервисы без состояния запроса - синглтоны, эндпоинты получают их
+    # из app.state (api.dependencies) без разрешения зависимостей.
+    user_service: providers.Provider[UserService] = providers.Singleton(
         UserService,
         repository=user_repository,
         auth=auth_service,
     )
-    order_service: providers.Provider[OrderService] = providers.Factory(
+    order_service: providers.Provider[OrderService] = providers.Singleton(
         OrderService,
-        repository=order_repository,
+        repositories=order_repositories,
+        publisher=broker_publisher,
+        redis=redis,
+        order_filter=order_bloom_filter,
+        event_hub=order_event_hub,
+    )
+    export_service: providers.Provider[ExportService] = providers.Singleton(
+        ExportService,
+        repositories=order_export_repositories,
+    )
+    partition_service: providers.Provider[PartitionService] = providers.Singleton(
+        PartitionService,
+        repositories=order_partition_repositories,
+        months_ahead=config.partition.ORDER_PARTITION_MONTHS_AHEAD,
+        archive_after_months=config.partition.ORDER_ARCHIVE_AFTER_MONTHS,
+        archive_tablespace=config.partition.ORDER_ARCHIVE_TABLESPACE,
+        archive_schema=config.partition.ORDER_ARCHIVE_SCHEMA,
+    )
+    order_expiry_service: providers.Provider[OrderExpiryService] = providers.Singleton(
+        OrderExpiryService,
+        repositories=order_repositories,
+        redis=redis,
+        pending_ttl=config.expiry.ORDER_PENDING_TTL,
+        batch_size=config.expiry.ORDER_EXPIRY_BATCH_SIZE,
+        max_batches=config.expiry.ORDER_EXPIRY_MAX_BATCHES,
+        batch_pause=config.expiry.ORDER_EXPIRY_BATCH_PAUSE,
+    )
+    order_cache_warmup_service: providers.Provider[OrderCacheWarmupService] = (
+        providers.Singleton(
+            OrderCacheWarmupService,
+            repositories=order_repositories,
+            redis=redis,
+            top=config.cache.CACHE_WARMUP_TOP,
+            chunk_size=config.cache.CACHE_WARMUP_CHUNK_SIZE,
+            rate=config.cache.CACHE_WARMUP_RATE,
+            decay=config.cache.CACHE_ACCESS_DECAY,
+            decay_interval=config.cache.CACHE_ACCESS_DECAY_INTERVAL,
+            max_keys=config.cache.CACHE_ACCESS_MAX_KEYS,
+        )
+    )
+    warmup_service: providers.Provider[WarmupService] = providers.Singleton(
+        WarmupService,
+        db=db,
+        redis=redis,
+        broker=rabbit_broker,
+        user_repository=user_repository,
+        order_repositories=order_repositories,
+        db_connections=config.warmup.WARMUP_DB_CONNECTIONS,
+        redis_connections=config.warmup.WARMUP_REDIS_CONNECTIONS,
+        retry_interval=config.warmup.WARMUP_RETRY_INTERVAL,
+        broker_timeout=config.warmup.WARMUP_BROKER_TIMEOUT,
     )
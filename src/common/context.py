@@ -0,0 +1,37 @@
+"""Контекст текущего HTTP запроса."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.types import Scope
+
+
+_current_scope: ContextVar[Scope | None] = ContextVar("current_scope", default=None)
+
+
+@contextmanager
+def request_scope(scope: Scope) -> Iterator[None]:
+    """Делает scope запроса доступным внутри блока."""
+    token = _current_scope.set(scope)
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+def get_current_scope() -> Scope | None:
+    """scope текущего запроса, None - вне запроса."""
+    return _current_scope.get()
+
+
+def get_current_route() -> str | None:
+    """
+    Маршрут текущего запроса: шаблон пути, если роутинг уже выполнен,
+    иначе путь запроса. None - вне запроса (фоновые задачи, CLI).
+    """
+    if (scope := _current_scope.get()) is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope["path"]
+    return f"{scope['method']} {path}"
@@ -0,0 +1,55 @@
+"""Периодические фоновые задачи приложения."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(
+    func: Callable[[], Awaitable[object]],
+    interval: float,
+    name: str,
+) -> None:
+    """Вызывает func каждые interval секунд, ошибки только логируются."""
+    while True:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Periodic task %s failed", name)
+        await asyncio.sleep(interval)
+
+
+class PeriodicTasks:
+    """Набор периодических задач, живущих вместе с приложением."""
+
+    def __init__(self) -> None:
+        self._jobs: list[tuple[str, Callable[[], Awaitable[object]], float]] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        interval: float,
+    ) -> None:
+        """Регистрирует задачу."""
+        self._jobs.append((name, func, interval))
+
+    def start(self) -> None:
+        """Запускает все зарегистрированные задачи."""
+        for name, func, interval in self._jobs:
+            self._tasks.append(
+                asyncio.create_task(run_periodically(func, interval, name), name=name)
+            )
+
+    async def stop(self) -> None:
+        """Останавливает запущенные задачи."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
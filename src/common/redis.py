@@ -1,57 +1,188 @@
-import hashlib
-import socket
-from collections.abc import AsyncIterator
-from typing import Any
-
-from cache_sdk.key_builder import _Func
-from redis.asyncio import Redis, from_url
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-async def init_redis_pool(
-    host: str, port: int, password: str = ""
-) -> AsyncIterator[Redis]:
-    kwargs = {}
-    if password:
-        kwargs["password"] = password
-    session = from_url(
-        f"redis://{host}",
-        port=port,
-        socket_timeout=10,
-        socket_keepalive=True,
-        socket_keepalive_options={
-            socket.TCP_KEEPIDLE: 30,
-            socket.TCP_KEEPINTVL: 5,
-            socket.TCP_KEEPCNT: 5,
-        },
-        health_check_interval=5,
-        protocol=3,
-    )
-    yield session
-    await session.aclose()
-
-
-def custom_key_builder(
-    __function: _Func,
-    __namespace: str = "",
-    *,
-    _request: Request | None = None,
-    _response: Response | None = None,
-    args: tuple[Any, ...],
-    kwargs: dict[str, Any],
-) -> str:
+"""Клиенты Redis: один узел, Redis Cluster или шардирование на клиенте."""
+
+import asyncio
+from collections.abc import Iterable, Sequence
+from typing import Any, Literal
+
+from redis.asyncio import Redis
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.commands.core import AsyncScript
+
+from common.sharding import HashRing
+
+
+RedisMode = Literal["standalone", "cluster", "sharded"]
+
+
+def _key_str(key: Any) -> str:
+    return key.decode() if isinstance(key, bytes) else str(key)
+
+
+def _parse_node(node: str) -> tuple[str, int]:
+    host, _, port = node.rpartition(":")
+    return host, int(port)
+
+
+def _create_node(node: str, password: str | None) -> Redis:
+    host, port = _parse_node(node)
+    return Redis(host=host, port=port, password=password)
+
+
+class ShardedPipeline:
+    """
+    Нетранзакционный пайплайн поверх шардов: команды группируются
+    по узлам и выполняются параллельно, результаты - в исходном порядке.
+
+    Первый аргумент каждой команды должен быть ключом.
+    """
+
+    def __init__(self, redis: "ShardedRedis") -> None:
+        self._redis = redis
+        self._commands: list[tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "ShardedPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def command(*args: Any, **kwargs: Any) -> "ShardedPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    async def execute(self) -> list[Any]:
+        commands, self._commands = self._commands, []
+        groups: dict[Redis, list[int]] = {}
+        for index, (_, args, _) in enumerate(commands):
+            groups.setdefault(self._redis.get_node(args[0]), []).append(index)
+
+        results: list[Any] = [None] * len(commands)
+
+        async def run(node: Redis, indexes: list[int]) -> None:
+            async with node.pipeline(transaction=False) as pipe:
+                for index in indexes:
+                    name, args, kwargs = commands[index]
+                    getattr(pipe, name)(*args, **kwargs)
+                for index, result in zip(indexes, await pipe.execute()):
+                    results[index] = result
+
+        await asyncio.gather(*(run(node, ix) for node, ix in groups.items()))
+        return results
+
+
+class ShardedScript:
+    """Lua скрипт, выполняемый на узле своих ключей."""
+
+    def __init__(self, redis: "ShardedRedis", script: str) -> None:
+        self._redis = redis
+        self._script = script
+        self._scripts: dict[Redis, AsyncScript] = {}
+
+    async def __call__(self, keys: Sequence[Any] = (), args: Sequence[Any] = ()) -> Any:
+        node = self._redis.get_node_for_keys(keys)
+        if (script := self._scripts.get(node)) is None:
+            script = self._scripts[node] = node.register_script(self._script)
+        return await script(keys=keys, args=args)
+
+
+class ShardedRedis:
     """
-    Генератор ключей, который подставляет в ключ id пользователя из request.
+    Шардирование ключей по независимым узлам Redis консистентным
+    хэшированием (с учётом hash tag).
+
+    Команды с одним ключом проксируются на его узел. Многоключевые
+    команды, кроме delete и mget, должны использовать ключи одного
+    hash tag. Pub/sub не поддерживается - для него есть отдельный клиент.
     """
 
-    if _request and (user_id := getattr(_request.user, "user_id", None)):
-        user_data = f"{user_id}:"
-    else:
-        user_data = ""
+    def __init__(self, nodes: dict[str, Redis], vnodes: int = 160) -> None:
+        self._nodes = nodes
+        self._ring = HashRing(nodes, vnodes=vnodes)
+
+    def get_node(self, key: Any) -> Redis:
+        return self._nodes[self._ring.get_node(_key_str(key))]
+
+    def get_node_for_keys(self, keys: Iterable[Any]) -> Redis:
+        nodes = {self.get_node(key) for key in keys}
+        if len(nodes) != 1:
+            raise ValueError("Keys belong to different shards, use a hash tag")
+        return nodes.pop()
+
+    def pipeline(self, transaction: bool = False) -> ShardedPipeline:
+        if transaction:
+            raise ValueError("Transactions are not supported across shards")
+        return ShardedPipeline(self)
 
-    cache_key = hashlib.sha256(
-        f"{__function.__module__}:{__function.__name__}:{args}:{kwargs}".encode()
-    ).hexdigest()
+    def register_script(self, script: str) -> ShardedScript:
+        return ShardedScript(self, script)
 
-    return f"{__namespace}:{user_data}{cache_key}"
+    def _group(self, keys: Iterable[Any]) -> dict[Redis, list[Any]]:
+        groups: dict[Redis, list[Any]] = {}
+        for key in keys:
+            groups.setdefault(self.get_node(key), []).append(key)
+        return groups
+
+    async def delete(self, *keys: Any) -> int:
+        groups = self._group(keys)
+        return sum(
+            await asyncio.gather(*(node.delete(*ks) for node, ks in groups.items()))
+        )
+
+    async def mget(self, keys: Iterable[Any], *args: Any) -> list[Any]:
+        keys = [*keys, *args]
+        groups = self._group(keys)
+        values = await asyncio.gather(*(node.mget(ks) for node, ks in groups.items()))
+        found = {}
+        for node_keys, node_values in zip(groups.values(), values):
+            found.update(zip(node_keys, node_values))
+        return [found[key] for key in keys]
+
+    async def ping(self) -> bool:
+        return all(
+            await asyncio.gather(*(node.ping() for node in self._nodes.values()))
+        )
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(node.aclose() for node in self._nodes.values()))
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def command(key: Any, *args: Any, **kwargs: Any) -> Any:
+            return await getattr(self.get_node(key), name)(key, *args, **kwargs)
+
+        return command
+
+
+def create_redis(
+    mode: RedisMode,
+    host: str,
+    port: int,
+    password: str = "",
+    nodes: Sequence[str] = (),
+) -> Redis | RedisCluster | ShardedRedis:
+    """
+    Клиент кэша.
+
+    standalone - один узел host:port; cluster - Redis Cluster, nodes -
+    стартовые узлы (по умолчанию host:port); sharded - консистентное
+    хэширование по независимым узлам nodes.
+    """
+    password = password or None
+    if mode == "cluster":
+        startup_nodes = [ClusterNode(*_parse_node(n)) for n in nodes] or [
+            ClusterNode(host, port)
+        ]
+        return RedisCluster(startup_nodes=startup_nodes, password=password)
+    if mode == "sharded":
+        if not nodes:
+            raise ValueError("REDIS_NODES is required for sharded mode")
+        return ShardedRedis({node: _create_node(node, password) for node in nodes})
+    return Redis(host=host, port=port, password=password)
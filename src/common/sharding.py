@@ -0,0 +1,63 @@
+"""Консистентное хэширование ключей по узлам."""
+
+import bisect
+import hashlib
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+
+N = TypeVar("N", bound=Hashable)
+
+
+def hash_tag(key: str) -> str:
+    """
+    Часть ключа, по которой выбирается узел: содержимое первых непустых
+    фигурных скобок (как hash tag в Redis Cluster), иначе весь ключ.
+    """
+    if (start := key.find("{")) != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return key
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+class HashRing(Generic[N]):
+    """
+    Кольцо консистентного хэширования с виртуальными узлами.
+
+    При добавлении или удалении одного из N узлов переезжает около 1/N
+    ключей - только те, что попадают на его участки кольца.
+    """
+
+    def __init__(self, nodes: Iterable[N] = (), vnodes: int = 160) -> None:
+        self.vnodes = vnodes
+        self._hashes: list[int] = []
+        self._nodes: list[N] = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(set(self._nodes))
+
+    def add(self, node: N) -> None:
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._hashes, point)
+            self._hashes.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def remove(self, node: N) -> None:
+        keep = [(h, n) for h, n in zip(self._hashes, self._nodes) if n != node]
+        self._hashes = [h for h, _ in keep]
+        self._nodes = [n for _, n in keep]
+
+    def get_node(self, key: str) -> N:
+        """Узел для ключа с учётом hash tag."""
+        if not self._nodes:
+            raise LookupError("Hash ring is empty")
+        index = bisect.bisect(self._hashes, _hash(hash_tag(key)))
+        return self._nodes[index % len(self._nodes)]
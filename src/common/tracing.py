@@ -0,0 +1,106 @@
+"""Распределённая трассировка (OpenTelemetry)."""
+
+import threading
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from common.config import TracingSettings
+
+
+try:
+    from faststream.rabbit.opentelemetry import RabbitTelemetryMiddleware
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+        OTLPSpanExporter,
+    )
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        SpanExporter,
+        SpanExportResult,
+    )
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+except ImportError:  # pragma: no cover - зависимости tracing опциональны
+    trace = None
+    SpanExporter = object
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Пишет спаны в файл, по одному JSON на строку."""
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence["ReadableSpan"]) -> "SpanExportResult":
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def setup_tracing(config: TracingSettings) -> "TracerProvider | None":
+    """
+    Настраивает провайдер трассировки и инструментирует Redis и Celery.
+
+    Контекст трассировки передаётся в заголовках сообщений AMQP:
+    FastStream - через RabbitTelemetryMiddleware брокера, Celery - через
+    собственный инструментатор (и при отправке задачи, и в воркере).
+    """
+    if not config.TRACING_ENABLED:
+        return None
+    if trace is None:
+        raise RuntimeError("Tracing requires the opentelemetry packages")
+
+    if config.TRACING_EXPORTER == "file":
+        exporter = JsonLinesSpanExporter(config.TRACING_FILE)
+    else:
+        exporter = OTLPSpanExporter(endpoint=config.TRACING_OTLP_ENDPOINT)
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(config.TRACING_SAMPLE_RATIO)),
+    )
+    # BatchSpanProcessor сам перезапускает поток экспорта после fork,
+    # поэтому провайдер переживает форк воркеров Celery.
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    RedisInstrumentor().instrument(tracer_provider=provider)
+    CeleryInstrumentor().instrument(tracer_provider=provider)
+    return provider
+
+
+def instrument_app(
+    app: FastAPI, engines: Iterable[AsyncEngine], provider: "TracerProvider | None"
+) -> None:
+    """Спаны HTTP запросов и запросов к БД (основной и шардов)."""
+    if provider is None:
+        return
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider)
+    SQLAlchemyInstrumentor().instrument(
+        engines=list({engine.sync_engine for engine in engines}),
+        tracer_provider=provider,
+    )
+
+
+def broker_middlewares(provider: "TracerProvider | None") -> tuple[Any, ...]:
+    """Middleware брокера: спаны публикации и обработки сообщений."""
+    if provider is None:
+        return ()
+    return (RabbitTelemetryMiddleware(tracer_provider=provider),)
@@ -0,0 +1,98 @@
+"""Сжатие ответов по Accept-Encoding."""
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard опционален
+    zstandard = None
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """zstd, если клиент и сервер его поддерживают, иначе gzip."""
+    encodings = set()
+    for part in accept_encoding.split(","):
+        value, *params = part.split(";")
+        if not any(p.replace(" ", "") in ("q=0", "q=0.0") for p in params):
+            encodings.add(value.strip().lower())
+    if zstandard is not None and "zstd" in encodings:
+        return "zstd"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы не меньше minimum_size байт в zstd или gzip.
+
+    Сжимаются только ответы одним сообщением: потоковые ответы (SSE,
+    выгрузки) и уже сжатые ответы передаются как есть, заголовки SSE -
+    без задержки.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self._zstd = None
+        if zstandard is not None:
+            self._zstd = zstandard.ZstdCompressor(level=zstd_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or headers.get(
+                    "content-type", ""
+                ).startswith("text/event-stream"):
+                    await send(message)
+                    return
+                # Заголовки отправим вместе с первым телом, когда будет
+                # известно, сжимать ли ответ.
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if not message.get("more_body", False) and len(body) >= self.minimum_size:
+                body = self._compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "zstd":
+            return self._zstd.compress(body)
+        return gzip.compress(body, self.gzip_level)
@@ -0,0 +1,237 @@
+"""Повторы запросов с заголовком Idempotency-Key."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Collection
+from typing import Any
+from uuid import uuid4
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_409_CONFLICT,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middlewares.utils import get_client_key, send_error
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# Снимает блокировку, только если она всё ещё принадлежит этому запросу.
+RELEASE_SCRIPT = """
+local value = redis.call("GET", KEYS[1])
+if value and cjson.decode(value)["owner"] == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyMiddleware:
+    """
+    Первый запрос с данным Idempotency-Key выполняется, а его ответ
+    (кроме 5xx) сохраняется в Redis на ttl секунд. Повторы получают
+    сохранённый ответ без выполнения, а повторы, пришедшие во время
+    выполнения первого, ждут его ответа до wait_timeout секунд.
+
+    Ключ действует в пределах клиента и привязан к телу запроса и Accept
+    (сохраняется одно представление ответа): тот же ключ с другим телом
+    или форматом ответа - ошибка 422. При недоступности Redis запросы
+    выполняются как обычно.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        redis: Redis,
+        routes: Collection[str],
+        ttl: int = 86400,
+        lock_ttl: int = 30,
+        wait_timeout: float = 10,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.app = app
+        self.redis = redis
+        self.routes = frozenset(routes)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.release_script = redis.register_script(RELEASE_SCRIPT)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or f"{scope['method']} {scope['path']}" not in self.routes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not (idempotency_key := headers.get(IDEMPOTENCY_HEADER)):
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await send_error(send, HTTP_400_BAD_REQUEST, "Слишком длинный ключ")
+            return
+
+        body, receive = await self._read_body(receive)
+        request = (
+            scope["method"].encode(),
+            scope["path"].encode(),
+            scope["query_string"],
+            # От Accept зависит формат сохранённого тела (JSON или msgpack).
+            headers.get("accept", "").encode(),
+        )
+        fingerprint = hashlib.sha256(b"\n".join((*request, body))).hexdigest()
+        key = f"idempotency:{{{get_client_key(scope)}}}:{idempotency_key}"
+        owner = uuid4().hex
+
+        try:
+            stored = await self._acquire_or_wait(key, owner, fingerprint)
+        except RedisError:
+            logger.warning("Idempotency check failed", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        if stored is None:
+            await self._execute(scope, receive, send, key, owner, fingerprint)
+        elif stored["fingerprint"] != fingerprint:
+            await send_error(
+                send,
+                HTTP_422_UNPROCESSABLE_ENTITY,
+                "Ключ идемпотентности уже использован с другим запросом",
+            )
+        elif stored["state"] == "pending":
+            await send_error(
+                send,
+                HTTP_409_CONFLICT,
+                "Запрос с этим ключом ещё выполняется",
+                {"Retry-After": "1"},
+            )
+        else:
+            await self._replay(send, stored)
+
+    async def _read_body(self, receive: Receive) -> tuple[bytes, Receive]:
+        """Читает тело целиком и возвращает receive, отдающий его заново."""
+        chunks, more_body = [], True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay_receive() -> Message:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return body, replay_receive
+
+    async def _acquire_or_wait(
+        self, key: str, owner: str, fingerprint: str
+    ) -> dict[str, Any] | None:
+        """
+        None - блокировка взята, запрос нужно выполнить. Иначе - запись
+        ключа: готовый ответ или pending, если ожидание истекло.
+        """
+        pending = json.dumps(
+            {"state": "pending", "owner": owner, "fingerprint": fingerprint}
+        )
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            if await self.redis.set(key, pending, nx=True, ex=self.lock_ttl):
+                return None
+            if (raw := await self.redis.get(key)) is None:
+                # Первый запрос завершился ошибкой и снял блокировку.
+                continue
+            stored = json.loads(raw)
+            if (
+                stored["state"] != "pending"
+                or stored["fingerprint"] != fingerprint
+                or time.monotonic() >= deadline
+            ):
+                return stored
+            await asyncio.sleep(self.poll_interval)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key: str,
+        owner: str,
+        fingerprint: str,
+    ) -> None:
+        response: dict[str, Any] = {"state": "done", "fingerprint": fingerprint}
+        body = []
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            await self._release(key, owner)
+            raise
+
+        if response.get("status", HTTP_500_INTERNAL_SERVER_ERROR) >= 500:
+            # Ошибку сервера не запоминаем - повтор выполнится заново.
+            await self._release(key, owner)
+            return
+
+        response["body"] = base64.b64encode(b"".join(body)).decode()
+        try:
+            await self.redis.set(key, json.dumps(response), ex=self.ttl)
+        except RedisError:
+            logger.warning("Failed to store idempotent response", exc_info=True)
+
+    async def _release(self, key: str, owner: str) -> None:
+        try:
+            await self.release_script(keys=[key], args=[owner])
+        except RedisError:
+            logger.warning("Failed to release idempotency key", exc_info=True)
+
+    async def _replay(self, send: Send, stored: dict[str, Any]) -> None:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in stored["headers"]
+        ]
+        headers.append((REPLAYED_HEADER, b"true"))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored["status"],
+                "headers": headers,
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": base64.b64decode(stored["body"])}
+        )
@@ -0,0 +1,132 @@
+"""Адаптивное ограничение конкурентности запросов."""
+
+import time
+
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middlewares.utils import send_error
+
+
+class AIMDLimiter:
+    """
+    Лимит одновременных запросов по схеме AIMD.
+
+    Пока задержка ниже целевой, лимит растёт примерно на единицу за
+    каждые limit запросов; при превышении - умножается на backoff,
+    но не чаще раза за latency_target, чтобы одна пачка медленных
+    ответов не обрушила лимит до минимума.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff: float,
+    ) -> None:
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        """Занимает слот, если лимит не исчерпан."""
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, failed: bool = False) -> None:
+        """Освобождает слот и пересчитывает лимит по задержке."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+
+        now = time.monotonic()
+        if failed or latency > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight * 2 >= self.limit:
+            # Растём только когда лимит действительно используется.
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class LoadSheddingMiddleware:
+    """
+    Отклоняет запросы сверх адаптивного лимита быстрым 503 с Retry-After,
+    вместо того чтобы копить их в event loop.
+
+    Лимит ведётся отдельно для каждого класса маршрутов. Задержка
+    считается до начала ответа, поэтому потоковые ответы не держат слот.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        route_classes: dict[str, str],
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        backoff: float = 0.9,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        # Длинные префиксы проверяются первыми.
+        self.route_classes = sorted(
+            route_classes.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.retry_after = retry_after
+        self.limiters = {
+            route_class: AIMDLimiter(
+                initial_limit, min_limit, max_limit, latency_target, backoff
+            )
+            for route_class in set(route_classes.values())
+        }
+
+    def get_limiter(self, path: str) -> AIMDLimiter | None:
+        for prefix, route_class in self.route_classes:
+            if path.startswith(prefix):
+                return self.limiters[route_class]
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (limiter := self.get_limiter(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        if not limiter.try_acquire():
+            await send_error(
+                send,
+                HTTP_503_SERVICE_UNAVAILABLE,
+                "Сервис перегружен, повторите запрос позже",
+                {"Retry-After": str(self.retry_after)},
+            )
+            return
+
+        started = time.monotonic()
+        released = False
+
+        def release(failed: bool) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release(time.monotonic() - started, failed)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                release(message["status"] >= 500)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            release(True)
+            raise
+        finally:
+            release(False)
@@ -0,0 +1,101 @@
+"""Профилирование отдельных запросов."""
+
+import asyncio
+import hashlib
+import hmac
+import random
+import re
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import uuid4
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover - pyinstrument опционален
+    Profiler = None
+
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def sign_profile_request(secret: str, path: str, expires: int) -> str:
+    """Значение заголовка X-Profile для пути, действительное до expires."""
+    signature = hmac.new(
+        secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{expires}:{signature}"
+
+
+def verify_profile_header(secret: str, path: str, value: str) -> bool:
+    """Проверяет подпись и срок действия заголовка X-Profile."""
+    expires, _, _ = value.partition(":")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_request(secret, path, int(expires)), value)
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует запрос семплирующим профайлером pyinstrument, если он
+    пришёл с подписанным заголовком X-Profile или попал в случайную
+    выборку sample_rate.
+
+    Профиль сохраняется в output_dir в формате speedscope (flame graph),
+    его имя возвращается в заголовке X-Profile-Id.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: str,
+        secret: str = "",
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+    ) -> None:
+        if Profiler is None:
+            raise RuntimeError("Profiling requires pyinstrument to be installed")
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.secret and (value := Headers(scope=scope).get(PROFILE_HEADER)):
+            return verify_profile_header(self.secret, scope["path"], value)
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        started = datetime.now(UTC)
+        slug = re.sub(r"[^\w-]+", "_", scope["path"]).strip("_")[:64]
+        name = f"{started:%Y%m%dT%H%M%S}_{scope['method']}_{slug}_{uuid4().hex[:8]}"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, name)
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            # Рендеринг и запись - вне event loop.
+            await asyncio.to_thread(self._save, profiler, name)
+
+    def _save(self, profiler: "Profiler", name: str) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{name}.speedscope.json"
+        path.write_text(profiler.output(renderer=SpeedscopeRenderer()))
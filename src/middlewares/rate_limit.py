@@ -0,0 +1,91 @@
+"""Ограничение частоты запросов клиента (token bucket в Redis)."""
+
+import logging
+import math
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from middlewares.utils import get_client_key, send_error
+
+
+logger = logging.getLogger(__name__)
+
+# Пополнение и списание токенов одной атомарной операцией.
+# Время берётся у Redis, чтобы не зависеть от часов узлов приложения.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimitMiddleware:
+    """
+    Token bucket на клиента, чтобы один шумный клиент не поднимал
+    задержку всем остальным. При недоступности Redis запросы пропускаются.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        redis: Redis,
+        rate: float,
+        burst: int,
+        prefixes: tuple[str, ...] = ("/",),
+    ) -> None:
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.prefixes = prefixes
+        self.script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        key = f"rate_limit:{{{get_client_key(scope)}}}"
+        try:
+            allowed, retry_after = await self.script(
+                keys=[key], args=[self.rate, self.burst, 1]
+            )
+        except RedisError:
+            logger.warning("Rate limit check failed", exc_info=True)
+            allowed, retry_after = 1, 0
+
+        if not int(allowed):
+            await send_error(
+                send,
+                HTTP_429_TOO_MANY_REQUESTS,
+                "Слишком много запросов",
+                {"Retry-After": str(max(1, math.ceil(float(retry_after))))},
+            )
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,20 @@
+"""Контекст запроса для логов и метрик."""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from common.context import request_scope
+
+
+class RequestContextMiddleware:
+    """Делает scope запроса доступным коду, у которого нет Request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_scope(scope):
+            await self.app(scope, receive, send)
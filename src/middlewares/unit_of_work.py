@@ -0,0 +1,39 @@
+"""Единица работы на HTTP запрос."""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from repositories.db import unit_of_work
+
+
+class UnitOfWorkMiddleware:
+    """
+    Открывает единицу работы на запрос: все репозитории используют одну
+    сессию, которая создаётся при первом обращении к БД.
+
+    Коммит выполняется перед отправкой заголовков ответа, поэтому ошибка
+    коммита ещё может превратиться в 500, а клиент не получит успешный
+    ответ на незафиксированные данные. Ответы с кодом >= 400 откатываются.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async with unit_of_work() as uow:
+            finished = False
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal finished
+                if message["type"] == "http.response.start" and not finished:
+                    finished = True
+                    if message["status"] < 400:
+                        await uow.commit()
+                    else:
+                        await uow.rollback()
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,46 @@
+import json
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import Scope, Send
+
+from services.auth import AuthService
+
+
+def get_client_key(scope: Scope) -> str:
+    """
+    Идентификатор клиента для лимитов: id пользователя из JWT,
+    а для анонимных запросов - IP адрес.
+    """
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{AuthService.decode_jwt(token)['id']}"
+        except (HTTPException, KeyError):
+            pass
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def send_error(
+    send: Send,
+    status_code: int,
+    detail: str,
+    headers: dict[str, str] | None = None,
+) -> None:
+    """Отправляет JSON ошибку напрямую в ASGI send."""
+    body = json.dumps({"detail": detail}).encode()
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    raw_headers.extend(
+        (name.lower().encode(), value.encode())
+        for name, value in (headers or {}).items()
+    )
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": raw_headers}
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -74,7 +74,9 @@ async def async_run_migrations_online() -> None:
 
     """
     configuration = config.get_section(config.config_ini_section)
-    configuration["sqlalchemy.url"] = settings.db.url
+    # Другая БД, например шард заказов: alembic -x db_url=... upgrade head
+    x_arguments = context.get_x_argument(as_dictionary=True)
+    configuration["sqlalchemy.url"] = x_arguments.get("db_url", settings.db.url)
     connectable = AsyncEngine(
         engine_from_config(
             configuration,
@@ -0,0 +1,151 @@
+"""order partitioning
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько месяцев вперёд создавать партиции при миграции,
+# дальше их поддерживает PartitionService.
+MONTHS_AHEAD = 3
+
+
+def _order_columns() -> list[sa.Column]:
+    return [
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("items", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("total_price", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE "order" RENAME TO order_legacy')
+    op.execute("ALTER TABLE order_legacy RENAME CONSTRAINT pk_order TO pk_order_legacy")
+    op.execute(
+        "ALTER TABLE order_legacy "
+        "RENAME CONSTRAINT fk_order_user_id_user TO fk_order_legacy_user_id_user"
+    )
+    op.execute("ALTER INDEX ix_order_id RENAME TO ix_order_legacy_id")
+
+    # Ключ партиционирования обязан входить в первичный ключ,
+    # поэтому глобальная уникальность id держится на uuid4.
+    op.create_table(
+        "order",
+        *_order_columns(),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.id"], name=op.f("fk_order_user_id_user")
+        ),
+        sa.PrimaryKeyConstraint("id", "created_at", name=op.f("pk_order")),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(op.f("ix_order_id"), "order", ["id"], unique=False)
+    op.create_index("ix_order_user_id_created_at", "order", ["user_id", "created_at"])
+    # Без партиции DEFAULT: с ней Postgres не выполняет
+    # DETACH PARTITION ... CONCURRENTLY при архивации.
+    # Помесячные партиции от самого старого заказа до MONTHS_AHEAD вперёд
+    # (или до самого нового, если он позже).
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            part_month timestamp;
+            last_month timestamp;
+        BEGIN
+            SELECT
+                date_trunc(
+                    'month', coalesce(min(created_at), now()) AT TIME ZONE 'UTC'
+                ),
+                date_trunc(
+                    'month', coalesce(max(created_at), now()) AT TIME ZONE 'UTC'
+                )
+            INTO part_month, last_month
+            FROM order_legacy;
+            last_month := greatest(
+                last_month,
+                date_trunc('month', now() AT TIME ZONE 'UTC')
+                    + interval '{MONTHS_AHEAD} months'
+            );
+            WHILE part_month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF "order" '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'order_p' || to_char(part_month, 'YYYY_MM'),
+                    part_month::text || '+00',
+                    (part_month + interval '1 month')::text || '+00'
+                );
+                part_month := part_month + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+
+    op.execute(
+        'INSERT INTO "order" '
+        "(user_id, items, total_price, status, id, created_at, updated_at) "
+        "SELECT user_id, items, total_price, status, id, created_at, updated_at "
+        "FROM order_legacy"
+    )
+    op.drop_table("order_legacy")
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE "order" RENAME TO order_partitioned')
+    op.execute(
+        "ALTER TABLE order_partitioned "
+        "RENAME CONSTRAINT pk_order TO pk_order_partitioned"
+    )
+    op.execute(
+        "ALTER TABLE order_partitioned "
+        "RENAME CONSTRAINT fk_order_user_id_user "
+        "TO fk_order_partitioned_user_id_user"
+    )
+    op.execute("ALTER INDEX ix_order_id RENAME TO ix_order_partitioned_id")
+    op.execute(
+        "ALTER INDEX ix_order_user_id_created_at "
+        "RENAME TO ix_order_partitioned_user_id_created_at"
+    )
+
+    op.create_table(
+        "order",
+        *_order_columns(),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.id"], name=op.f("fk_order_user_id_user")
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_order")),
+    )
+    op.create_index(op.f("ix_order_id"), "order", ["id"], unique=True)
+    op.execute(
+        'INSERT INTO "order" '
+        "(user_id, items, total_price, status, id, created_at, updated_at) "
+        "SELECT user_id, items, total_price, status, id, created_at, updated_at "
+        "FROM order_partitioned"
+    )
+    # Партиции удаляются вместе с родительской таблицей.
+    op.drop_table("order_partitioned")
@@ -0,0 +1,36 @@
+"""order shard foreign key
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def is_order_shard() -> bool:
+    """Миграция шарда заказов: alembic -x order_shard=true ..."""
+    return context.get_x_argument(as_dictionary=True).get("order_shard") == "true"
+
+
+def upgrade() -> None:
+    # Пользователи живут в основной БД, на шарде заказов внешний ключ
+    # ссылался бы на пустую таблицу.
+    if is_order_shard():
+        op.drop_constraint(op.f("fk_order_user_id_user"), "order", type_="foreignkey")
+
+
+def downgrade() -> None:
+    if is_order_shard():
+        op.create_foreign_key(
+            op.f("fk_order_user_id_user"), "order", "user", ["user_id"], ["id"]
+        )
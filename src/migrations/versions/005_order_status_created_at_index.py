@@ -0,0 +1,60 @@
+"""order status created_at index
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_order_status_created_at"
+
+
+def _partitions() -> list[str]:
+    return list(
+        op.get_bind().scalars(
+            sa.text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_namespace ns ON ns.oid = parent.relnamespace "
+                "WHERE parent.relname = 'order' AND ns.nspname = current_schema()"
+            )
+        )
+    )
+
+
+def upgrade() -> None:
+    # CONCURRENTLY на партиционированной таблице не поддерживается.
+    # Индекс создаётся только на родителе (ON ONLY, пока невалидный),
+    # индексы партиций строятся CONCURRENTLY и присоединяются к нему -
+    # после последней партиции индекс родителя становится валидным.
+    # Новые партиции получают индекс автоматически.
+    op.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY "order" (status, created_at)'
+    )
+    partitions = _partitions()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            # Имя как у индекса, который Postgres создал бы сам.
+            index = f"{partition}_status_created_at_idx"
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index}" '
+                f'ON "{partition}" (status, created_at)'
+            )
+            op.execute(f'ALTER INDEX {INDEX_NAME} ATTACH PARTITION "{index}"')
+
+
+def downgrade() -> None:
+    # Удаляет и индексы партиций.
+    op.drop_index(INDEX_NAME, table_name="order", if_exists=True)
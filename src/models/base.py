@@ -11,7 +11,8 @@ class Base(DeclarativeBase):
 
     def as_dict(self) -> dict[str, Any]:
         """Возвращает представление в виде словаря."""
-        res = self.__dict__
+        # Копия, чтобы не ломать состояние объекта в сессии.
+        res = dict(self.__dict__)
         res.pop("_sa_instance_state", None)
         return res
 
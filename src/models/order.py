@@ -1,7 +1,8 @@
 import uuid
 from typing import Any
 
-from sqlalchemy import Float, ForeignKey, String
+import sqlalchemy as sa
+from sqlalchemy import UUID, Float, ForeignKey, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -10,9 +11,32 @@ from schemas.enums.order import OrderStatusEnum
 
 
 class Order(Base):
-    """Таблица пользователей."""
+    """Таблица заказов.
+
+    Партиционирована помесячно по created_at, партиции создаёт
+    и архивирует PartitionService.
+    """
 
     __tablename__ = "order"
+    __table_args__ = (
+        sa.Index("ix_order_user_id_created_at", "user_id", "created_at"),
+        # Поиск зависших заказов в статусе pending (OrderExpiryService).
+        sa.Index("ix_order_status_created_at", "status", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Ключ партиционирования обязан входить в первичный ключ,
+    # поэтому уникальный индекс только по id невозможен.
+    id = sa.Column(  # noqa: A003
+        UUID, primary_key=True, index=True, default=uuid.uuid4
+    )
+    created_at = sa.Column(
+        sa.DateTime(timezone=True),
+        primary_key=True,
+        default=sa.func.now(),
+        nullable=False,
+        server_default=sa.func.now(),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"))
     items: Mapped[dict[str, Any]] = mapped_column(JSONB())
@@ -1,3 +1,4 @@
+import sqlalchemy as sa
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -11,3 +12,7 @@ class User(Base):
 
     email: Mapped[str] = mapped_column(String(300))
     password: Mapped[str] = mapped_column(String(100))
+
+
+# Email сравнивается без учёта регистра и должен быть уникальным.
+sa.Index("ix_user_email_lower", sa.func.lower(User.email), unique=True)
@@ -0,0 +1,45 @@
+"""Массовая загрузка данных через COPY ... FROM STDIN."""
+
+from collections.abc import AsyncIterable, Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.db import BaseSession
+
+
+class BulkLoadRepository(BaseSession):
+    """Репозиторий для массовой загрузки строк в таблицы."""
+
+    async def copy_records(
+        self,
+        table: str,
+        columns: Sequence[str],
+        records: Iterable[tuple[Any, ...]] | AsyncIterable[tuple[Any, ...]],
+        session: AsyncSession | None = None,
+    ) -> str:
+        """Загружает кортежи в бинарном формате COPY."""
+        async with self.use_or_create_session(session) as session:
+            raw_conn = await (await session.connection()).get_raw_connection()
+            return await raw_conn.driver_connection.copy_records_to_table(
+                table, records=records, columns=list(columns)
+            )
+
+    async def copy_csv(
+        self,
+        table: str,
+        columns: Sequence[str],
+        source: Path | AsyncIterable[bytes],
+        session: AsyncSession | None = None,
+    ) -> str:
+        """Загружает CSV с заголовком как есть, без разбора в Python."""
+        async with self.use_or_create_session(session) as session:
+            raw_conn = await (await session.connection()).get_raw_connection()
+            return await raw_conn.driver_connection.copy_to_table(
+                table,
+                source=source,
+                columns=list(columns),
+                format="csv",
+                header=True,
+            )
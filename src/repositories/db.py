@@ -1,19 +1,135 @@
 """Base Session."""
 
-from collections.abc import AsyncGenerator, AsyncIterator, Callable
+import asyncio
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+)
 from contextlib import (
     AbstractAsyncContextManager,
     AsyncExitStack,
     asynccontextmanager,
+    contextmanager,
 )
+from contextvars import ContextVar
+from typing import Any
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
 from models.base import Base
+from repositories.slow_query import SlowQueryLogger
+
+
+class UnitOfWork:
+    """
+    Единица работы: одна сессия на БД на всё время запроса или задачи.
+
+    Сессия создаётся при первом обращении, поэтому запросы без обращения
+    к БД не занимают соединение. Коммит выполняется один раз в конце.
+    Сессия не рассчитана на конкурентное использование, поэтому
+    параллельные (asyncio.gather) обращения к репозиториям внутри одной
+    единицы работы недопустимы.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[Database, AsyncSession] = {}
+        self._after_commit: list[Callable[[], Awaitable[Any]]] = []
+
+    @property
+    def has_sessions(self) -> bool:
+        """Было ли обращение к БД."""
+        return bool(self._sessions)
+
+    def get_session(self, database: "Database") -> AsyncSession:
+        """Возвращает сессию для БД, создавая её при первом обращении."""
+        if (session := self._sessions.get(database)) is None:
+            session = self._sessions[database] = database.create_session()
+        return session
+
+    def add_after_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """Регистрирует действие, выполняемое после успешного коммита."""
+        self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        """Коммитит все сессии и выполняет действия после коммита."""
+        for session in self._sessions.values():
+            await session.commit()
+
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            await callback()
+
+    async def rollback(self) -> None:
+        """Откатывает все сессии, действия после коммита отбрасываются."""
+        self._after_commit.clear()
+        for session in self._sessions.values():
+            await session.rollback()
+
+    async def close(self) -> None:
+        """Закрывает сессии и возвращает соединения в пул."""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+
+_current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    """Текущая единица работы, если она открыта."""
+    return _current_unit_of_work.get()
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Открывает единицу работы для всех репозиториев внутри блока."""
+    uow = UnitOfWork()
+    token = _current_unit_of_work.set(uow)
+    try:
+        yield uow
+        await uow.commit()
+    except BaseException:
+        await uow.rollback()
+        raise
+    finally:
+        await uow.close()
+        _current_unit_of_work.reset(token)
+
+
+@contextmanager
+def outside_unit_of_work() -> Iterator[None]:
+    """
+    Репозитории внутри блока работают в собственных коротких сессиях.
+
+    Нужно в долгих ответах (потоках), чтобы не держать соединение
+    единицы работы запроса до конца ответа.
+    """
+    token = _current_unit_of_work.set(None)
+    try:
+        yield
+    finally:
+        _current_unit_of_work.reset(token)
+
+
+async def after_commit(callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Выполняет callback после коммита текущей единицы работы,
+    а если её нет - сразу.
+    """
+    if (uow := current_unit_of_work()) is None:
+        await callback()
+    else:
+        uow.add_after_commit(callback)
 
 
 class Database:
@@ -23,11 +139,23 @@ class Database:
         self,
         db_url: str,
         echo: bool = False,
+        slow_query_threshold: float | None = None,
+        pool_size: int = 10,
+        max_overflow: int = 10,
+        prepared_statement_cache_size: int = 500,
     ) -> None:
         self._engine = create_async_engine(
             db_url,
             echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            # Кэш подготовленных выражений asyncpg на каждое соединение.
+            connect_args={
+                "prepared_statement_cache_size": prepared_statement_cache_size
+            },
         )
+        if slow_query_threshold is not None:
+            SlowQueryLogger(slow_query_threshold).install(self._engine.sync_engine)
         self._session_factory = async_sessionmaker(
             autocommit=False,
             autoflush=False,
@@ -35,16 +163,65 @@ class Database:
             bind=self._engine,
         )
 
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
     async def create_database(self) -> None:
         """Создает БД."""
         async with self._engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    async def dispose(self) -> None:
+        """Закрывает соединения пула."""
+        await self._engine.dispose()
+
+    async def warm_up(
+        self,
+        connections: int,
+        callback: Callable[[AsyncSession], Awaitable[Any]],
+    ) -> None:
+        """
+        Открывает connections соединений одновременно и выполняет
+        на каждом callback (сессия привязана к соединению), после чего
+        соединения остаются в пуле.
+
+        Заполняет кэш скомпилированных запросов SQLAlchemy и кэш
+        подготовленных выражений asyncpg каждого соединения.
+        """
+        async with AsyncExitStack() as stack:
+            sessions = []
+            for _ in range(connections):
+                connection = await stack.enter_async_context(self._engine.connect())
+                sessions.append(AsyncSession(bind=connection))
+
+            async def run(session: AsyncSession) -> None:
+                try:
+                    await callback(session)
+                finally:
+                    await session.rollback()
+                    await session.close()
+
+            await asyncio.gather(*(run(session) for session in sessions))
+
+    def create_session(self) -> AsyncSession:
+        """Создаёт новую сессию без управления транзакцией."""
+        return self._session_factory()
+
     @asynccontextmanager
     async def session(
         self,
     ) -> AsyncGenerator[AsyncSession, None]:
-        """Возвращает и обрабатывает сессию."""
+        """
+        Возвращает и обрабатывает сессию.
+
+        Внутри единицы работы отдаётся её общая сессия, а коммит
+        откладывается до завершения единицы работы.
+        """
+        if (uow := current_unit_of_work()) is not None:
+            yield uow.get_session(self)
+            return
+
         session: AsyncSession = self._session_factory()
         try:
             yield session
@@ -0,0 +1,79 @@
+"""Объединение одиночных запросов в пакетные (по образцу DataLoader)."""
+
+import asyncio
+import contextvars
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Собирает ключи, запрошенные в течение одного тика event loop
+    (или окна window секунд), и загружает их одним вызовом batch_fn.
+
+    Одинаковые ключи загружаются один раз, результат получают все
+    ожидающие. Пакет выполняется в пустом контексте, чтобы не попасть
+    в единицу работы одного из запросов.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[dict[K, V]]],
+        window: float = 0.0,
+        max_batch_size: int = 500,
+    ) -> None:
+        self._batch_fn = batch_fn
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending: dict[K, list[asyncio.Future[V | None]]] = {}
+        self._handle: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        """Возвращает значение для ключа или None, если его нет."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[V | None] = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        elif self._handle is None:
+            self._handle = (
+                loop.call_later(self._window, self._dispatch)
+                if self._window > 0
+                else loop.call_soon(self._dispatch)
+            )
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch), context=contextvars.Context())
+        # Держим ссылку, чтобы задачу не собрал GC.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, list[asyncio.Future[V | None]]]) -> None:
+        try:
+            results = await self._batch_fn(list(batch))
+        except Exception as exc:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+
+        for key, futures in batch.items():
+            value = results.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
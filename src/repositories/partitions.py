@@ -0,0 +1,177 @@
+"""Обслуживание партиций таблицы заказов."""
+
+import re
+from collections.abc import Iterable
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.db import BaseSession
+
+
+# Ключи advisory lock, чтобы обслуживание шло только на одном узле.
+ENSURE_LOCK_KEY = 7_260_001
+ARCHIVE_LOCK_KEY = 7_260_002
+
+PARTITION_NAME_RE = re.compile(r"^order_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(value: date) -> date:
+    """Возвращает первое число месяца."""
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Сдвигает первое число месяца на months месяцев."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Имя партиции заказов за месяц."""
+    return f"order_p{month:%Y_%m}"
+
+
+class OrderPartitionRepository(BaseSession):
+    """Репозиторий для управления партициями заказов."""
+
+    async def ensure_partitions(
+        self,
+        start: date,
+        months_ahead: int,
+        session: AsyncSession | None = None,
+    ) -> list[str]:
+        """Создаёт недостающие партиции с месяца start на months_ahead вперёд."""
+        first = month_start(start)
+        last = add_months(month_start(datetime.now(tz=UTC).date()), months_ahead)
+
+        created = []
+        async with self.use_or_create_session(session) as session:
+            if not await session.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:key)"),
+                {"key": ENSURE_LOCK_KEY},
+            ):
+                return created
+
+            month = first
+            while month <= last:
+                name = partition_name(month)
+                exists = await session.scalar(
+                    text("SELECT to_regclass(:name) IS NOT NULL"),
+                    {"name": f'"{name}"'},
+                )
+                if not exists:
+                    upper = add_months(month, 1)
+                    await session.execute(
+                        text(
+                            f'CREATE TABLE "{name}" PARTITION OF "order" '
+                            f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') "
+                            f"TO ('{upper:%Y-%m-%d} 00:00:00+00')"
+                        )
+                    )
+                    created.append(name)
+                month = add_months(month, 1)
+        return created
+
+    async def get_partitions(
+        self, session: AsyncSession | None = None
+    ) -> dict[str, date]:
+        """Возвращает помесячные партиции, присоединённые к таблице заказов."""
+        query = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_namespace ns ON ns.oid = parent.relnamespace "
+            "WHERE parent.relname = 'order' AND ns.nspname = current_schema()"
+        )
+        async with self.use_or_create_session(session) as session:
+            names = (await session.scalars(query)).all()
+
+        partitions = {}
+        for name in names:
+            if match := PARTITION_NAME_RE.match(name):
+                partitions[name] = date(int(match["year"]), int(match["month"]), 1)
+        return partitions
+
+    async def archive_partitions(
+        self,
+        before: date,
+        statuses: Iterable[str],
+        tablespace: str = "",
+        schema: str = "archive",
+        session: AsyncSession | None = None,
+    ) -> list[str]:
+        """
+        Архивирует партиции старше before, в которых остались только
+        заказы с указанными статусами.
+
+        Если задан tablespace, партиция переносится в него и остаётся
+        доступной для запросов, иначе отсоединяется (DETACH CONCURRENTLY)
+        и переносится в схему schema.
+        """
+        statuses = list(statuses)
+        archived = []
+
+        async with self.use_or_create_session(session) as session:
+            # DETACH ... CONCURRENTLY нельзя выполнять внутри транзакции.
+            conn = await session.connection(
+                execution_options={"isolation_level": "AUTOCOMMIT"}
+            )
+            if not await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": ARCHIVE_LOCK_KEY},
+            ):
+                return archived
+
+            try:
+                partitions = await self.get_partitions(session)
+                for name, month in sorted(partitions.items(), key=lambda p: p[1]):
+                    if add_months(month, 1) > before:
+                        continue
+
+                    has_active = await conn.scalar(
+                        text(
+                            f'SELECT EXISTS (SELECT 1 FROM "{name}" '
+                            f"WHERE status <> ALL(:statuses))"
+                        ),
+                        {"statuses": statuses},
+                    )
+                    if has_active:
+                        continue
+
+                    if tablespace:
+                        current = await conn.scalar(
+                            text(
+                                "SELECT ts.spcname FROM pg_class c "
+                                "LEFT JOIN pg_tablespace ts "
+                                "ON ts.oid = c.reltablespace "
+                                "WHERE c.oid = to_regclass(:name)"
+                            ),
+                            {"name": f'"{name}"'},
+                        )
+                        if current == tablespace:
+                            continue
+                        await conn.execute(
+                            text(f'ALTER TABLE "{name}" SET TABLESPACE "{tablespace}"')
+                        )
+                    else:
+                        await conn.execute(
+                            text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+                        )
+                        await conn.execute(
+                            text(
+                                f'ALTER TABLE "order" '
+                                f'DETACH PARTITION "{name}" CONCURRENTLY'
+                            )
+                        )
+                        await conn.execute(
+                            text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"')
+                        )
+                    archived.append(name)
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": ARCHIVE_LOCK_KEY},
+                )
+        return archived
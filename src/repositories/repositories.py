@@ -1,31 +1,72 @@
+from collections.abc import AsyncIterator, Collection, Hashable, Iterable
 from contextlib import AbstractAsyncContextManager
+from datetime import datetime
 from typing import Any, Callable, TypeVar
 from uuid import UUID
 
 from pydantic import BaseModel
-from sqlalchemy import Insert, Select, Update, insert, select, update
+from sqlalchemy import (
+    Executable,
+    Insert,
+    Select,
+    Update,
+    any_,
+    bindparam,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.base import Base
-from repositories.db import BaseSession
-from schemas.order import OrderDbSchema
+from repositories.db import BaseSession, current_unit_of_work
+from repositories.loader import BatchLoader
+from schemas.enums.order import OrderStatusEnum
+from schemas.order import OrderDbSchema, OrderPartialSchema
+from schemas.user import UserDbSchema
 
 
 ModelDB = TypeVar("ModelDB", bound=Base, covariant=True)
 ModelDBRow = TypeVar("ModelDBRow", bound=BaseModel, covariant=True)
 
 
+def _bind_values(columns: Iterable[str]) -> dict[str, Any]:
+    # Имена параметров VALUES/SET не должны совпадать с именами колонок.
+    return {column: bindparam(f"p_{column}") for column in columns}
+
+
+def _bind_params(data: dict[str, Any]) -> dict[str, Any]:
+    return {f"p_{column}": value for column, value in data.items()}
+
+
 class BaseRepository(BaseSession):
     def __init__(
         self,
         session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]],
         model: ModelDB,
         model_schema: ModelDBRow,
+        batch_window: float | None = None,
     ) -> None:
+        """
+        batch_window включает объединение get_by без явной сессии
+        в пакетные запросы: 0 - ключи одного тика event loop,
+        больше 0 - окно в секундах.
+
+        Запросы методов строятся один раз (с bindparam вместо значений)
+        и переиспользуются: SQLAlchemy не строит запрос и его ключ кэша
+        компиляции на каждый вызов, а текст запроса не меняется, поэтому
+        asyncpg берёт подготовленное выражение из кэша соединения.
+        """
         super().__init__(session_factory)
 
         self._model = model
         self._model_schema = model_schema
+        self._batch_window = batch_window
+        self._loaders: dict[str, BatchLoader] = {}
+        self._statements: dict[Hashable, Executable] = {}
 
     async def add(
         self,
@@ -35,7 +76,35 @@ class BaseRepository(BaseSession):
         if isinstance(insert_data, BaseModel):
             insert_data = insert_data.model_dump()
 
-        query = self.get_insert_query().values(**insert_data)
+        columns = tuple(sorted(insert_data))
+        query = self._get_statement(
+            ("add", columns),
+            lambda: self.get_insert_query().values(_bind_values(columns)),
+        )
+        async with self.use_or_create_session(session) as session:
+            result = await session.scalar(query, _bind_params(insert_data))
+        return self._get_parsed_object(result)
+
+    async def add_on_conflict_do_nothing(
+        self,
+        insert_data: BaseModel | dict[str, Any],
+        index_elements: list[Any],
+        session: AsyncSession | None = None,
+    ) -> ModelDBRow | None:
+        """
+        Вставка одним запросом INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+        Возвращает None, если запись с таким значением индекса уже есть.
+        """
+        if isinstance(insert_data, BaseModel):
+            insert_data = insert_data.model_dump()
+
+        query = (
+            pg_insert(self._model)
+            .values(**insert_data)
+            .on_conflict_do_nothing(index_elements=index_elements)
+            .returning(self._model)
+        )
         async with self.use_or_create_session(session) as session:
             result = await session.scalar(query)
         return self._get_parsed_object(result)
@@ -44,13 +113,43 @@ class BaseRepository(BaseSession):
         self, field: str, value: Any, session: AsyncSession | None = None
     ) -> ModelDBRow | None:
         """Получение объекта по соответствию полю."""
-        query = self.get_base_query().where(getattr(self._model, field) == value)
+        if session is None and self._can_batch():
+            return await self._get_loader(field).load(value)
+
+        query = self._get_statement(
+            ("get_by", field),
+            lambda: self.get_base_query().where(
+                getattr(self._model, field) == bindparam("value")
+            ),
+        )
         async with self.use_or_create_session(session) as session:
-            result = await session.scalar(query)
+            result = await session.scalar(query, {"value": value})
             if result:
                 return self._get_parsed_object(result)
             return None
 
+    async def get_many_by(
+        self,
+        field: str,
+        values: Iterable[Any],
+        session: AsyncSession | None = None,
+    ) -> dict[Any, ModelDBRow]:
+        """
+        Получение объектов по списку значений поля одним запросом
+        WHERE field = ANY(:values). Для каждого значения - первый объект.
+        """
+        query = self._get_statement(
+            ("get_many_by", field), lambda: self._build_get_many_by(field)
+        )
+        async with self.use_or_create_session(session) as session:
+            rows = (await session.scalars(query, {"values": list(values)})).all()
+
+        result = {}
+        for row in rows:
+            parsed = self._get_parsed_object(row)
+            result.setdefault(getattr(parsed, field), parsed)
+        return result
+
     async def update(
         self,
         pk: UUID,
@@ -60,9 +159,18 @@ class BaseRepository(BaseSession):
         """Update object by pk."""
         if isinstance(obj_in, BaseModel):
             obj_in = obj_in.model_dump(exclude_unset=True)
-        query = self.get_update_query().where(self._model.id == pk).values(**obj_in)
+        columns = tuple(sorted(obj_in))
+        query = self._get_statement(
+            ("update", columns),
+            lambda: self.get_update_query()
+            .where(self._model.id == bindparam("pk"))
+            .values(_bind_values(columns))
+            # Критерий с bindparam не вычисляется в Python, поэтому
+            # загруженный в сессию объект обновляется из RETURNING.
+            .execution_options(synchronize_session=False, populate_existing=True),
+        )
         async with self.use_or_create_session(session) as session:
-            result = await session.scalar(query)
+            result = await session.scalar(query, {"pk": pk, **_bind_params(obj_in)})
             if result:
                 return self._get_parsed_object(result)
             return None
@@ -79,6 +187,34 @@ class BaseRepository(BaseSession):
         """Get update query."""
         return update(self._model).returning(self._model)
 
+    def _get_statement(
+        self, key: Hashable, build: Callable[[], Executable]
+    ) -> Executable:
+        """Запрос из кэша репозитория, при первом обращении - build()."""
+        if (statement := self._statements.get(key)) is None:
+            statement = self._statements[key] = build()
+        return statement
+
+    def _build_get_many_by(self, field: str) -> Select:
+        column = getattr(self._model, field)
+        return self.get_base_query().where(
+            column == any_(bindparam("values", type_=ARRAY(column.type)))
+        )
+
+    def _can_batch(self) -> bool:
+        # Если запрос уже открыл сессию, читаем через неё, чтобы видеть
+        # собственные незакоммиченные изменения.
+        uow = current_unit_of_work()
+        return self._batch_window is not None and not (uow and uow.has_sessions)
+
+    def _get_loader(self, field: str) -> BatchLoader:
+        if (loader := self._loaders.get(field)) is None:
+            loader = self._loaders[field] = BatchLoader(
+                lambda values: self.get_many_by(field, values),
+                window=self._batch_window,
+            )
+        return loader
+
     def _get_parsed_object(self, raw_result: Any | None) -> ModelDBRow | None:
         """Convert raw to model schema."""
         if raw_result is None:
@@ -91,20 +227,166 @@ class BaseRepository(BaseSession):
 class UserRepository(BaseRepository):
     """Репозиторий для работы с пользователями."""
 
+    async def get_by_email(
+        self, email: str, session: AsyncSession | None = None
+    ) -> UserDbSchema | None:
+        """Поиск по email без учёта регистра (индекс ix_user_email_lower)."""
+        query = self._get_statement(
+            "get_by_email",
+            lambda: self.get_base_query().where(
+                func.lower(self._model.email) == bindparam("email")
+            ),
+        )
+        async with self.use_or_create_session(session) as session:
+            result = await session.scalar(query, {"email": email.lower()})
+        return self._get_parsed_object(result)
+
+    async def add_unique(
+        self,
+        insert_data: BaseModel | dict[str, Any],
+        session: AsyncSession | None = None,
+    ) -> UserDbSchema | None:
+        """Создаёт пользователя, None - если email уже занят."""
+        return await self.add_on_conflict_do_nothing(
+            insert_data,
+            index_elements=[func.lower(self._model.email)],
+            session=session,
+        )
+
 
 class OrderRepository(BaseRepository):
     """Репозиторий для работы с заказами."""
 
     async def get_orders(
-        self, user_id: UUID, session: AsyncSession | None = None
-    ) -> list[OrderDbSchema]:
-        query = self.get_base_query().where(self._model.user_id == user_id)
+        self,
+        user_id: UUID,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        fields: Collection[str] | None = None,
+        session: AsyncSession | None = None,
+    ) -> list[OrderDbSchema] | list[OrderPartialSchema]:
+        """
+        Заказы пользователя.
 
+        Ограничение по created_at позволяет Postgres отсечь лишние партиции.
+        fields - выбираемые колонки: без items не читается и не
+        передаётся самая объёмная часть заказа. Тогда возвращаются
+        OrderPartialSchema только с этими полями.
+        """
+        columns = None
+        if fields is not None:
+            columns = tuple(
+                column.key
+                for column in self._model.__table__.columns
+                if column.key in fields
+            )
+        query = self._get_statement(
+            ("get_orders", created_from is not None, created_to is not None, columns),
+            lambda: self._build_get_orders(created_from, created_to, columns),
+        )
+        params = {
+            "user_id": user_id,
+            "created_from": created_from,
+            "created_to": created_to,
+        }
         async with self.use_or_create_session(session) as session:
-            fetch_results = await session.execute(query)
+            fetch_results = await session.execute(query, params)
+            if columns is not None:
+                return [
+                    OrderPartialSchema.model_validate(row)
+                    for row in fetch_results.mappings()
+                ]
             results = fetch_results.scalars().all()
 
             if not results:
                 return []
 
             return [self._get_parsed_object(r) for r in results]
+
+    def _build_get_orders(
+        self,
+        created_from: datetime | None,
+        created_to: datetime | None,
+        columns: tuple[str, ...] | None = None,
+    ) -> Select:
+        query = (
+            self.get_base_query()
+            if columns is None
+            else select(*(getattr(self._model, column) for column in columns))
+        )
+        query = query.where(self._model.user_id == bindparam("user_id"))
+        if created_from is not None:
+            query = query.where(self._model.created_at >= bindparam("created_from"))
+        if created_to is not None:
+            query = query.where(self._model.created_at < bindparam("created_to"))
+        return query
+
+    async def expire_pending(
+        self,
+        before: datetime,
+        limit: int,
+        session: AsyncSession | None = None,
+    ) -> list[tuple[UUID, UUID]]:
+        """
+        Отменяет до limit самых старых заказов в статусе pending,
+        созданных раньше before. Возвращает (id, user_id) отменённых.
+
+        Заказы выбираются по индексу ix_order_status_created_at
+        с FOR UPDATE SKIP LOCKED: строки, заблокированные другим узлом
+        или запросом, пропускаются без ожидания. Без сессии каждый
+        вызов - отдельная короткая транзакция.
+        """
+        query = self._get_statement("expire_pending", self._build_expire_pending)
+        params = {
+            "pending": OrderStatusEnum.PENDING,
+            "cancelled": OrderStatusEnum.CANCELLED,
+            "before": before,
+            "limit": limit,
+        }
+        async with self.use_or_create_session(session) as session:
+            result = await session.execute(query, params)
+            return [(row.id, row.user_id) for row in result]
+
+    def _build_expire_pending(self) -> Update:
+        # Core-таблица: объекты сессии не синхронизируются, updated_at
+        # обновляется через onupdate колонки.
+        table = self._model.__table__
+        batch = (
+            select(table.c.id, table.c.created_at)
+            .where(
+                table.c.status == bindparam("pending"),
+                table.c.created_at < bindparam("before"),
+            )
+            .order_by(table.c.created_at)
+            .limit(bindparam("limit"))
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        return (
+            update(table)
+            .where(
+                table.c.id == batch.c.id,
+                table.c.created_at == batch.c.created_at,
+            )
+            .values(status=bindparam("cancelled"))
+            .returning(table.c.id, table.c.user_id)
+        )
+
+    async def iter_ids(
+        self, batch_size: int = 10_000, session: AsyncSession | None = None
+    ) -> AsyncIterator[list[UUID]]:
+        """Потоково отдаёт id всех заказов пачками."""
+        query = select(self._model.id).execution_options(yield_per=batch_size)
+        async with self.use_or_create_session(session) as session:
+            result = await session.stream_scalars(query)
+            async for ids in result.partitions():
+                yield ids
+
+    async def get_sample(
+        self, limit: int, session: AsyncSession | None = None
+    ) -> list[OrderDbSchema]:
+        """Произвольные заказы (без сортировки), например для обучения словаря."""
+        query = self.get_base_query().limit(limit)
+        async with self.use_or_create_session(session) as session:
+            results = (await session.scalars(query)).all()
+        return [self._get_parsed_object(r) for r in results]
@@ -0,0 +1,136 @@
+"""Шардирование заказов по нескольким БД по user_id."""
+
+import asyncio
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Sequence,
+)
+from typing import Any, Generic, TypeVar
+from uuid import UUID
+
+from common.sharding import HashRing
+from repositories.db import Database
+
+
+R = TypeVar("R")
+T = TypeVar("T")
+
+_STREAM_DONE = object()
+
+
+class DatabaseShards:
+    """
+    БД шардов и выбор шарда пользователя консистентным хэшированием.
+
+    Узлы кольца - номера шардов, поэтому порядок БД в настройке
+    менять нельзя, новые шарды добавляются в конец. При добавлении
+    к N шардам переезжает около 1/N пользователей - их заказы нужно
+    перенести до переключения.
+    """
+
+    def __init__(self, databases: Sequence[Database], vnodes: int = 160) -> None:
+        if not databases:
+            raise ValueError("At least one database is required")
+        self.databases = list(databases)
+        self._ring = HashRing(range(len(self.databases)), vnodes=vnodes)
+
+    def __len__(self) -> int:
+        return len(self.databases)
+
+    def __iter__(self) -> Iterator[Database]:
+        return iter(self.databases)
+
+    def get_index(self, user_id: UUID) -> int:
+        """Номер шарда, которому принадлежат заказы пользователя."""
+        if len(self.databases) == 1:
+            return 0
+        return self._ring.get_node(str(user_id))
+
+    def get(self, user_id: UUID) -> Database:
+        return self.databases[self.get_index(user_id)]
+
+    async def dispose(self) -> None:
+        await asyncio.gather(*(database.dispose() for database in self.databases))
+
+
+def create_order_shards(
+    default: Database, urls: Sequence[str], **kwargs: Any
+) -> DatabaseShards:
+    """Шарды заказов по urls, без них - заказы в основной БД default."""
+    if not urls:
+        return DatabaseShards([default])
+    return DatabaseShards([Database(url, **kwargs) for url in urls])
+
+
+class ShardedRepository(Generic[R]):
+    """Репозиторий одного типа на каждом шарде."""
+
+    def __init__(self, shards: DatabaseShards, factory: Callable[..., R]) -> None:
+        """factory создаёт репозиторий по session_factory шарда."""
+        self.shards = shards
+        self.repositories = [
+            factory(session_factory=database.session) for database in shards
+        ]
+
+    def __len__(self) -> int:
+        return len(self.repositories)
+
+    def __iter__(self) -> Iterator[R]:
+        return iter(self.repositories)
+
+    def items(self) -> Iterator[tuple[Database, R]]:
+        return zip(self.shards, self.repositories)
+
+    def for_user(self, user_id: UUID) -> R:
+        """Репозиторий шарда, на котором лежат заказы пользователя."""
+        return self.repositories[self.shards.get_index(user_id)]
+
+    async def fan_out(self, call: Callable[[R], Awaitable[T]]) -> list[T]:
+        """Выполняет call на всех шардах параллельно."""
+        return await asyncio.gather(*(call(r) for r in self.repositories))
+
+
+async def merge_streams(
+    streams: Sequence[AsyncIterator[T]], buffer: int = 16
+) -> AsyncIterator[T]:
+    """
+    Отдаёт элементы нескольких потоков по мере готовности, читая потоки
+    параллельно. Порядок между потоками не сохраняется.
+
+    Общая ограниченная очередь притормаживает чтение, если потребитель
+    не успевает. Ошибка любого потока прерывает остальные.
+    """
+    if len(streams) == 1:
+        async for item in streams[0]:
+            yield item
+        return
+
+    queue: asyncio.Queue[Any] = asyncio.Queue(buffer)
+
+    async def pump(stream: AsyncIterator[T]) -> None:
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(_STREAM_DONE)
+
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is _STREAM_DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,78 @@
+"""Журнал медленных SQL запросов."""
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from common.context import get_current_route
+
+
+logger = logging.getLogger(__name__)
+
+
+def describe_parameters(parameters: Any, many: bool = False) -> Any:
+    """
+    Форма параметров запроса без значений: типы и длины коллекций.
+
+    Значения не пишутся в журнал - в них могут быть персональные данные.
+    """
+    if many:
+        # executemany: число наборов и форма первого.
+        first = describe_parameters(parameters[0]) if parameters else None
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return {key: _describe_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_describe_value(value) for value in parameters]
+    return _describe_value(parameters)
+
+
+def _describe_value(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        # Массивы (ANY(:values)) - только длина.
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+class SlowQueryLogger:
+    """
+    Пишет в журнал запросы дольше threshold секунд: текст, форму
+    параметров, длительность и маршрут, из которого выполнен запрос.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+
+    def install(self, engine: Engine) -> None:
+        """Подписывается на события выполнения запросов engine."""
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, many):
+        # Время начала - в контексте выполнения, а не в стеке на соединении:
+        # при ошибке запроса after_cursor_execute не вызывается.
+        if context is not None:
+            context.query_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        started = getattr(context, "query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+        logger.warning(
+            "Slow query %.3fs route=%s params=%s\n%s",
+            duration,
+            get_current_route() or "-",
+            describe_parameters(parameters, many),
+            statement,
+            extra={
+                "duration": duration,
+                "route": get_current_route(),
+                "statement": statement,
+            },
+        )
@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class ExportFormatEnum(StrEnum):
+    """Форматы выгрузки."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
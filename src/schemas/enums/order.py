@@ -8,3 +8,22 @@ class OrderStatusEnum(StrEnum):
     PAID = "paid"
     SHIPPED = "shipped"
     CANCELLED = "cancelled"
+
+
+class OrderEventTypeEnum(StrEnum):
+    """Типы событий заказа."""
+
+    STATUS = "status"
+    PROCESSED = "processed"
+
+
+class OrderFieldEnum(StrEnum):
+    """Поля заказа, которые можно запросить параметром fields."""
+
+    ID = "id"
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+    USER_ID = "user_id"
+    ITEMS = "items"
+    TOTAL_PRICE = "total_price"
+    STATUS = "status"
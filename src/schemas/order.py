@@ -4,11 +4,13 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from schemas.enums.order import OrderStatusEnum
+from schemas.enums.order import OrderEventTypeEnum, OrderStatusEnum
 
 
 class OrderBrokerSchema(BaseModel):
     id: UUID
+    # Нет в сообщениях, опубликованных до добавления поля.
+    user_id: UUID | None = None
 
 
 class OrderDbSchema(BaseModel):
@@ -23,8 +25,32 @@ class OrderDbSchema(BaseModel):
     status: OrderStatusEnum
 
 
+class OrderPartialSchema(BaseModel):
+    """
+    Заказ с частью полей (параметр fields). В ответ попадают только
+    заданные поля, поэтому эндпоинты отдают его с exclude_unset.
+    """
+
+    id: UUID | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    user_id: UUID | None = None
+    items: dict[str, Any] | None = None
+    total_price: float | None = None
+    status: OrderStatusEnum | None = None
+
+
 class OrderBodySchema(BaseModel):
     """Схема для создания заказа."""
 
     items: dict[str, Any]
     total_price: float
+
+
+class OrderEventSchema(BaseModel):
+    """Событие заказа для push-уведомлений."""
+
+    event: OrderEventTypeEnum
+    id: UUID
+    user_id: UUID
+    status: OrderStatusEnum | None = None
@@ -0,0 +1,131 @@
+"""Прогрев кэша заказов самыми востребованными заказами."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from repositories.repositories import OrderRepository
+from repositories.sharding import ShardedRepository
+from services.order import (
+    ORDER_CACHE_NAMESPACE,
+    ORDER_CACHE_TTL,
+    order_cache_key,
+)
+from services.utils.cache import (
+    build_access_key,
+    parse_cache_key,
+    write_through,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderCacheWarmupService:
+    """
+    Прогрев кэша get_order после перезапуска или очистки Redis.
+
+    get_order учитывает выборку обращений к ключам кэша в sorted set,
+    maintain периодически уменьшает счётчики (затухание), запоминает
+    top самых частых ключей в памяти процесса и, если пропала отметка
+    прогрева, прогревает кэш. Отметку ставит SET NX, поэтому прогревает
+    один узел. Список в памяти нужен, потому что вместе с кэшем
+    пропадает и sorted set.
+
+    Заказы читаются пачками по chunk_size одним WHERE id = ANY(...)
+    и пишутся одним пайплайном, не быстрее rate заказов в секунду.
+    """
+
+    def __init__(
+        self,
+        repositories: ShardedRepository[OrderRepository],
+        redis: Redis,
+        top: int = 10_000,
+        chunk_size: int = 500,
+        rate: float = 5000,
+        decay: float = 0.5,
+        decay_interval: int = 3600,
+        max_keys: int = 100_000,
+    ):
+        self.repositories = repositories
+        self.redis = redis
+        self.top = top
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.decay = decay
+        self.decay_interval = decay_interval
+        self.max_keys = max_keys
+        self.access_key = build_access_key(ORDER_CACHE_NAMESPACE)
+        self.marker_key = f"cache_warm:{ORDER_CACHE_NAMESPACE}"
+        self._hot_keys: list[str] = []
+
+    async def maintain(self) -> None:
+        """Прогрев при пропавшей отметке, затухание и обновление top."""
+        if await self.redis.set(self.marker_key, 1, nx=True):
+            # Redis очищен или перезапущен (или отметку вытеснили).
+            await self.warm_up(self._hot_keys or None)
+        await self.decay_counters()
+        self._hot_keys = await self.get_hot_keys()
+
+    async def decay_counters(self) -> None:
+        """Раз в decay_interval на все узлы умножает счётчики на decay."""
+        lock_key = f"{self.access_key}:decay"
+        if not await self.redis.set(lock_key, 1, nx=True, ex=self.decay_interval):
+            return
+        await self.redis.zunionstore(self.access_key, {self.access_key: self.decay})
+        # Остаются только max_keys самых частых ключей.
+        await self.redis.zremrangebyrank(self.access_key, 0, -self.max_keys - 1)
+
+    async def get_hot_keys(self) -> list[str]:
+        """top самых частых ключей кэша заказов."""
+        keys = await self.redis.zrevrange(self.access_key, 0, self.top - 1)
+        return [key.decode() if isinstance(key, bytes) else key for key in keys]
+
+    async def warm_up(self, keys: Sequence[str] | None = None) -> int:
+        """
+        Записывает в кэш заказы по ключам keys, по умолчанию - top
+        самых частых. Возвращает число записанных заказов.
+        """
+        if keys is None:
+            keys = await self.get_hot_keys()
+
+        # Заказы пользователя лежат на его шарде.
+        owners: dict[UUID, UUID] = {}
+        by_shard: dict[int, list[UUID]] = {}
+        for key in keys:
+            params = parse_cache_key(key)
+            order_id, user_id = UUID(params["order_id"]), UUID(params["user_id"])
+            owners[order_id] = user_id
+            index = self.repositories.shards.get_index(user_id)
+            by_shard.setdefault(index, []).append(order_id)
+
+        warmed = 0
+        for index, ids in by_shard.items():
+            repository = self.repositories.repositories[index]
+            for start in range(0, len(ids), self.chunk_size):
+                started = time.monotonic()
+                chunk = ids[start : start + self.chunk_size]
+                orders = await repository.get_many_by("id", chunk)
+                # Чужой заказ get_order не отдал бы из кэша - 403.
+                values = {
+                    order_cache_key(order.id, order.user_id): order
+                    for order in orders.values()
+                    if owners[order.id] == order.user_id
+                }
+                # Не перезаписываем значения, уже записанные запросами.
+                await write_through(
+                    self.redis, values, ORDER_CACHE_TTL, only_missing=True
+                )
+                warmed += len(values)
+                # Ограничение скорости, чтобы прогрев не нагружал БД.
+                delay = len(chunk) / self.rate - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+        if warmed:
+            logger.info("Warmed up order cache with %d orders", warmed)
+        return warmed
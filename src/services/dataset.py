@@ -0,0 +1,143 @@
+"""Генерация синтетических пользователей и заказов для нагрузочных тестов."""
+
+import json
+import math
+import random
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from typing import Any
+
+from schemas.enums.order import OrderStatusEnum
+
+
+USER_COLUMNS = ("id", "email", "password", "created_at", "updated_at")
+ORDER_COLUMNS = (
+    "id",
+    "user_id",
+    "items",
+    "total_price",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+STATUS_WEIGHTS = {
+    OrderStatusEnum.PENDING: 0.1,
+    OrderStatusEnum.PAID: 0.2,
+    OrderStatusEnum.SHIPPED: 0.6,
+    OrderStatusEnum.CANCELLED: 0.1,
+}
+
+# Сериализация JSON - самая дорогая часть генерации, поэтому
+# набор items генерируется заранее и переиспользуется.
+ITEMS_POOL_SIZE = 256
+
+
+class OrdersDistributionEnum(StrEnum):
+    """Распределение количества заказов на пользователя."""
+
+    CONSTANT = "constant"
+    UNIFORM = "uniform"
+    POISSON = "poisson"
+    PARETO = "pareto"
+
+
+@dataclass(frozen=True)
+class DatasetConfig:
+    """Параметры синтетического набора данных."""
+
+    users: int
+    orders_per_user: float
+    distribution: OrdersDistributionEnum = OrdersDistributionEnum.POISSON
+    items_size: int = 512
+    months: int = 12
+    seed: int = 0
+
+
+def make_items(rnd: random.Random, size: int) -> tuple[str, float]:
+    """Возвращает JSON items примерно size байт и сумму заказа."""
+    items: dict[str, Any] = {}
+    total = 0.0
+    while len(json.dumps(items)) < size:
+        price = round(rnd.uniform(1, 500), 2)
+        quantity = rnd.randint(1, 5)
+        items[f"sku-{rnd.randrange(10**6):06d}"] = {
+            "quantity": quantity,
+            "price": price,
+            "title": "x" * rnd.randint(8, 48),
+        }
+        total += price * quantity
+    return json.dumps(items), round(total, 2)
+
+
+def orders_count(
+    rnd: random.Random, mean: float, distribution: OrdersDistributionEnum
+) -> int:
+    """Количество заказов пользователя для выбранного распределения."""
+    match distribution:
+        case OrdersDistributionEnum.CONSTANT:
+            return round(mean)
+        case OrdersDistributionEnum.UNIFORM:
+            return rnd.randint(0, round(2 * mean))
+        case OrdersDistributionEnum.PARETO:
+            # alpha = 1.5: тяжёлый хвост, среднее равно mean.
+            return round(mean / 3 * rnd.paretovariate(1.5))
+        case OrdersDistributionEnum.POISSON:
+            if mean > 30:
+                return max(0, round(rnd.gauss(mean, math.sqrt(mean))))
+            limit, count, product = math.exp(-mean), 0, rnd.random()
+            while product > limit:
+                count += 1
+                product *= rnd.random()
+            return count
+
+
+def generate(
+    config: DatasetConfig, part: int = 0, parts: int = 1
+) -> Iterator[tuple[tuple[Any, ...], list[tuple[Any, ...]]]]:
+    """
+    Генерирует пользователей части part из parts вместе с их заказами.
+
+    Части не пересекаются, поэтому их можно загружать параллельно.
+    """
+    rnd = random.Random(f"{config.seed}:{part}")
+    run_id = uuid.UUID(int=random.Random(config.seed).getrandbits(128)).hex[:8]
+    items_pool = [make_items(rnd, config.items_size) for _ in range(ITEMS_POOL_SIZE)]
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    now = datetime.now(tz=UTC)
+    period = timedelta(days=30 * config.months).total_seconds()
+
+    for number in range(part, config.users, parts):
+        user_created = now - timedelta(seconds=rnd.uniform(0, period))
+        user_id = uuid.UUID(int=rnd.getrandbits(128), version=4)
+        user = (
+            user_id,
+            f"user-{run_id}-{number}@example.com",
+            "password",
+            user_created,
+            user_created,
+        )
+
+        orders = []
+        count = orders_count(rnd, config.orders_per_user, config.distribution)
+        for _ in range(count):
+            created_at = user_created + timedelta(
+                seconds=rnd.uniform(0, (now - user_created).total_seconds())
+            )
+            items, total_price = rnd.choice(items_pool)
+            orders.append(
+                (
+                    uuid.UUID(int=rnd.getrandbits(128), version=4),
+                    user_id,
+                    items,
+                    total_price,
+                    rnd.choices(statuses, weights)[0],
+                    created_at,
+                    created_at,
+                )
+            )
+        yield user, orders
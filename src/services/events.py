@@ -0,0 +1,94 @@
+"""Push-уведомления об изменениях заказов через Redis pub/sub."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+from pydantic import ValidationError
+from redis.asyncio import Redis
+
+from schemas.order import OrderEventSchema
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderEventHub:
+    """
+    Раздаёт события заказов подключённым клиентам.
+
+    Процесс держит одну подписку на канал Redis (открывается при первом
+    подключении клиента) и рассылает события в очереди подписчиков
+    по user_id. Подключение клиента стоит одной небольшой очереди.
+    """
+
+    def __init__(self, redis: Redis, channel: str, queue_size: int = 16) -> None:
+        self.redis = redis
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: dict[UUID, set[asyncio.Queue[OrderEventSchema]]] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def publish(self, event: OrderEventSchema) -> None:
+        """Публикует событие заказа для всех процессов API."""
+        await self.redis.publish(self.channel, event.model_dump_json())
+
+    @asynccontextmanager
+    async def subscribe(
+        self, user_id: UUID
+    ) -> AsyncIterator[asyncio.Queue[OrderEventSchema]]:
+        """Очередь событий заказов пользователя на время подключения."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+        queue: asyncio.Queue[OrderEventSchema] = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers[user_id]
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    async def stop(self) -> None:
+        """Закрывает подписку на канал."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        self._dispatch(message["data"])
+            except Exception:
+                # Любая ошибка (обрыв, таймаут) не должна оставить
+                # подписчиков без событий - переподключаемся.
+                logger.warning(
+                    "Order events subscription lost, reconnecting", exc_info=True
+                )
+                await asyncio.sleep(1)
+
+    def _dispatch(self, data: bytes) -> None:
+        try:
+            event = OrderEventSchema.model_validate_json(data)
+        except ValidationError:
+            logger.warning("Invalid order event: %r", data)
+            return
+
+        for queue in self._subscribers.get(event.user_id, ()):
+            if queue.full():
+                # Медленный клиент: вытесняем самое старое событие.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+def format_sse(event: OrderEventSchema) -> str:
+    """Сообщение в формате Server-Sent Events."""
+    return f"event: {event.event}\ndata: {event.model_dump_json()}\n\n"
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from redis.asyncio import Redis
+
+from repositories.repositories import OrderRepository
+from repositories.sharding import ShardedRepository
+from services.order import order_cache_key
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderExpiryService:
+    """
+    Отмена заказов, зависших в статусе pending (брошенное оформление).
+
+    Заказы отменяются пачками по batch_size, каждая пачка - отдельная
+    короткая транзакция, за запуск - не больше max_batches пачек на шард,
+    остальное - в следующий запуск. Строки выбираются с SKIP LOCKED,
+    поэтому задача может одновременно работать на нескольких узлах.
+    """
+
+    def __init__(
+        self,
+        repositories: ShardedRepository[OrderRepository],
+        redis: Redis,
+        pending_ttl: float,
+        batch_size: int = 500,
+        max_batches: int = 20,
+        batch_pause: float = 0.1,
+    ):
+        self.repositories = repositories
+        self.redis = redis
+        self.pending_ttl = pending_ttl
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_pause = batch_pause
+
+    async def expire(self) -> int:
+        """Отменяет заказы в статусе pending старше pending_ttl."""
+        before = datetime.now(tz=UTC) - timedelta(seconds=self.pending_ttl)
+        results = await self.repositories.fan_out(
+            lambda repository: self._expire_shard(repository, before)
+        )
+        expired = sum(results)
+        if expired:
+            logger.info("Cancelled %d stale pending orders", expired)
+        return expired
+
+    async def _expire_shard(self, repository: OrderRepository, before: datetime) -> int:
+        expired = 0
+        for _ in range(self.max_batches):
+            orders = await repository.expire_pending(before, self.batch_size)
+            if orders:
+                # Одним DEL на пачку, get_order перечитает заказ из БД.
+                await self.redis.delete(*(order_cache_key(*order) for order in orders))
+            expired += len(orders)
+            if len(orders) < self.batch_size:
+                break
+            # Пауза между пачками сглаживает нагрузку на БД и реплики.
+            await asyncio.sleep(self.batch_pause)
+        return expired
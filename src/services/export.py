@@ -0,0 +1,92 @@
+import zlib
+from collections.abc import AsyncIterator
+from datetime import datetime
+from uuid import UUID
+
+from repositories.export import CSV_HEADER, OrderExportRepository
+from repositories.sharding import ShardedRepository, merge_streams
+from schemas.enums.export import ExportFormatEnum
+
+
+MEDIA_TYPES = {
+    ExportFormatEnum.CSV: "text/csv",
+    ExportFormatEnum.NDJSON: "application/x-ndjson",
+}
+
+
+class ExportService:
+    """Сервис для выгрузки заказов."""
+
+    def __init__(
+        self,
+        repositories: ShardedRepository[OrderExportRepository],
+    ):
+        self.repositories = repositories
+
+    @staticmethod
+    def get_filename(export_format: ExportFormatEnum, compress: bool) -> str:
+        """Имя файла выгрузки."""
+        return f"orders.{export_format}{'.gz' if compress else ''}"
+
+    async def export_orders(
+        self,
+        export_format: ExportFormatEnum,
+        compress: bool = False,
+        user_id: UUID | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Потоково отдаёт заказы, при необходимости сжимая их gzip."""
+        stream = self._stream_orders(
+            export_format,
+            user_id=user_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        if not compress:
+            async for chunk in stream:
+                yield chunk
+            return
+
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        async for chunk in stream:
+            if data := compressor.compress(chunk):
+                yield data
+        yield compressor.flush()
+
+    async def _stream_orders(
+        self,
+        export_format: ExportFormatEnum,
+        user_id: UUID | None,
+        created_from: datetime | None,
+        created_to: datetime | None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Заказы пользователя читаются с его шарда, остальные выгрузки -
+        со всех шардов параллельно (строки шардов перемешиваются).
+        """
+        if user_id is not None:
+            stream = self.repositories.for_user(user_id).stream_orders(
+                export_format,
+                user_id=user_id,
+                created_from=created_from,
+                created_to=created_to,
+            )
+            async for chunk in stream:
+                yield chunk
+            return
+
+        # Заголовок CSV - один на всю выгрузку, а не от каждого шарда.
+        if export_format == ExportFormatEnum.CSV:
+            yield CSV_HEADER
+        streams = [
+            repository.stream_orders(
+                export_format,
+                created_from=created_from,
+                created_to=created_to,
+                header=False,
+            )
+            for repository in self.repositories
+        ]
+        async for chunk in merge_streams(streams):
+            yield chunk
@@ -1,43 +1,130 @@
+import asyncio
+from collections.abc import AsyncIterator, Collection
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException
+from redis.asyncio import Redis
 from starlette.status import HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
 
-from broker.utils import broker_publish
+from broker.publisher import BrokerPublisher
+from common.config import settings
+from repositories.db import after_commit, outside_unit_of_work
 from repositories.repositories import OrderRepository
-from schemas.enums.order import OrderStatusEnum
-from schemas.order import OrderDbSchema
-from services.utils.cache import redis_cache
+from repositories.sharding import ShardedRepository
+from schemas.enums.order import OrderEventTypeEnum, OrderStatusEnum
+from schemas.order import OrderDbSchema, OrderEventSchema, OrderPartialSchema
+from services.events import OrderEventHub, format_sse
+from services.utils.bloom import RedisBloomFilter
+from services.utils.cache import build_cache_key, redis_cache, write_through
+
+
+ORDER_CACHE_NAMESPACE = "order"
+ORDER_CACHE_TTL = 300
+
+
+def order_cache_key(order_id: UUID, user_id: UUID) -> str:
+    """Ключ, под которым get_order кэширует заказ."""
+    return build_cache_key(
+        ORDER_CACHE_NAMESPACE,
+        hash_tag=str(user_id),
+        order_id=order_id,
+        user_id=user_id,
+    )
 
 
 class OrderService:
-    """Сервис для работы с заказами."""
+    """
+    Сервис для работы с заказами.
+
+    Заказы пользователя лежат на одном шарде, поэтому все операции
+    выполняются на шарде, выбранном по user_id.
+    """
 
     def __init__(
         self,
-        repository: OrderRepository,
+        repositories: ShardedRepository[OrderRepository],
+        publisher: BrokerPublisher,
+        redis: Redis,
+        order_filter: RedisBloomFilter,
+        event_hub: OrderEventHub,
     ):
-        self.repository = repository
+        self.repositories = repositories
+        self.publisher = publisher
+        self.redis = redis
+        self.order_filter = order_filter
+        self.event_hub = event_hub
+
+    async def cache_orders(self, *orders: OrderDbSchema) -> None:
+        """Записывает заказы под ключи get_order (write-through)."""
+        await write_through(
+            self.redis,
+            {order_cache_key(order.id, order.user_id): order for order in orders},
+            ORDER_CACHE_TTL,
+        )
 
     async def create_order(
         self,
         # TODO Нужна pydantic schema
         data: dict[str, Any],
     ) -> OrderDbSchema:
-        order = await self.repository.add(data)
-        # TODO вынести queue в переменные
-        await broker_publish({"data": {"id": order.id}}, "new_order")
+        repository = self.repositories.for_user(data["user_id"])
+        order = await repository.add(data)
+        # До коммита: лишний id в фильтре безопасен, пропущенный - нет.
+        await self.order_filter.add(order.id)
+
+        # Кэш и событие - только после коммита, иначе консьюмер может
+        # не найти заказ в БД, а кэш - отдать незафиксированные данные.
+        async def on_commit() -> None:
+            await self.cache_orders(order)
+            # TODO вынести queue в переменные
+            # Подтверждения RabbitMQ ответ не ждёт: сообщение публикуется
+            # из очереди издателя, ожидание - только если она заполнена.
+            await self.publisher.enqueue(
+                {"data": {"id": order.id, "user_id": order.user_id}}, "new_order"
+            )
+
+        await after_commit(on_commit)
         return order
 
-    @redis_cache()
     async def get_order(
         self,
         *,
         order_id: UUID,
         user_id: UUID,
+        fields: Collection[str] | None = None,
+    ) -> OrderDbSchema | OrderPartialSchema:
+        """fields - поля ответа, по умолчанию все."""
+        # Заведомо несуществующие id отсекаются без обращения к кэшу и БД.
+        if not await self.order_filter.might_contain(order_id):
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+            )
+        order = await self._get_order(order_id=order_id, user_id=user_id)
+        if fields is None:
+            return order
+        # Заказ кэшируется целиком, остальные поля просто не сериализуются.
+        return OrderPartialSchema.model_construct(
+            **{field: getattr(order, field) for field in fields}
+        )
+
+    @redis_cache(
+        ttl=ORDER_CACHE_TTL,
+        namespace=ORDER_CACHE_NAMESPACE,
+        hash_tag_kwarg="user_id",
+        negative_ttl=settings.cache.CACHE_NEGATIVE_TTL,
+        access_sample_rate=settings.cache.CACHE_ACCESS_SAMPLE_RATE,
+    )
+    async def _get_order(
+        self,
+        *,
+        order_id: UUID,
+        user_id: UUID,
     ) -> OrderDbSchema:
-        order = await self.repository.get_by("id", order_id)
+        # Чужой заказ на другом шарде не найдётся - это тоже 404.
+        repository = self.repositories.for_user(user_id)
+        order = await repository.get_by("id", order_id)
         if not order:
             raise HTTPException(
                 status_code=HTTP_404_NOT_FOUND,
@@ -48,20 +135,86 @@ class OrderService:
             )
         return order
 
-    @redis_cache(is_update=True, exclude_kwargs=frozenset("order_status"))
     async def update_status(
         self,
-        *order_id: UUID,
+        *,
+        order_id: UUID,
         user_id: UUID,
         order_status: OrderStatusEnum,
     ) -> OrderDbSchema:
         await self.get_order(order_id=order_id, user_id=user_id)
-        updated_order = await self.repository.update(order_id, {"status": order_status})
+        repository = self.repositories.for_user(user_id)
+        updated_order = await repository.update(order_id, {"status": order_status})
+        if updated_order is None:
+            # Заказ удалён между проверкой и UPDATE.
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+            )
 
+        async def on_commit() -> None:
+            await self.cache_orders(updated_order)
+            await self.event_hub.publish(
+                OrderEventSchema(
+                    event=OrderEventTypeEnum.STATUS,
+                    id=updated_order.id,
+                    user_id=updated_order.user_id,
+                    status=updated_order.status,
+                )
+            )
+
+        await after_commit(on_commit)
         return updated_order
 
     async def get_orders(
         self,
         user_id: UUID,
-    ) -> list[OrderDbSchema]:
-        return await self.repository.get_orders(user_id=user_id)
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        fields: Collection[str] | None = None,
+    ) -> list[OrderDbSchema] | list[OrderPartialSchema]:
+        return await self.repositories.for_user(user_id).get_orders(
+            user_id=user_id,
+            created_from=created_from,
+            created_to=created_to,
+            fields=fields,
+        )
+
+    async def stream_events(
+        self,
+        *,
+        user_id: UUID,
+        order_id: UUID | None = None,
+        heartbeat: float = 15,
+    ) -> AsyncIterator[str]:
+        """
+        Поток событий заказов пользователя в формате Server-Sent Events.
+
+        Если передан order_id, сначала отдаётся текущий статус заказа
+        (после подписки, чтобы не пропустить изменение между ними).
+        """
+        async with self.event_hub.subscribe(user_id) as queue:
+            if order_id is not None:
+                try:
+                    with outside_unit_of_work():
+                        order = await self.get_order(order_id=order_id, user_id=user_id)
+                except HTTPException:
+                    pass
+                else:
+                    yield format_sse(
+                        OrderEventSchema(
+                            event=OrderEventTypeEnum.STATUS,
+                            id=order.id,
+                            user_id=order.user_id,
+                            status=order.status,
+                        )
+                    )
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except TimeoutError:
+                    # Комментарий SSE не даёт прокси закрыть соединение.
+                    yield ": ping\n\n"
+                    continue
+                if order_id is None or event.id == order_id:
+                    yield format_sse(event)
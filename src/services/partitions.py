@@ -0,0 +1,80 @@
+import logging
+from datetime import UTC, date, datetime
+
+from repositories.partitions import (
+    OrderPartitionRepository,
+    add_months,
+    month_start,
+)
+from repositories.sharding import ShardedRepository
+from schemas.enums.order import OrderStatusEnum
+
+
+logger = logging.getLogger(__name__)
+
+# Заказы в этих статусах больше не меняются и могут уйти в архив.
+ARCHIVE_STATUSES = frozenset(
+    {OrderStatusEnum.SHIPPED, OrderStatusEnum.CANCELLED},
+)
+
+
+def _merge_names(results: list[list[str]]) -> list[str]:
+    # На шардах одинаковые имена партиций.
+    return sorted({name for names in results for name in names})
+
+
+class PartitionService:
+    """Сервис обслуживания партиций таблицы заказов на всех шардах."""
+
+    def __init__(
+        self,
+        repositories: ShardedRepository[OrderPartitionRepository],
+        months_ahead: int,
+        archive_after_months: int,
+        archive_tablespace: str = "",
+        archive_schema: str = "archive",
+    ):
+        self.repositories = repositories
+        self.months_ahead = months_ahead
+        self.archive_after_months = archive_after_months
+        self.archive_tablespace = archive_tablespace
+        self.archive_schema = archive_schema
+
+    async def ensure_partitions(self) -> list[str]:
+        """Создаёт партиции на текущий и months_ahead следующих месяцев."""
+        created = await self.ensure_partitions_from(datetime.now(tz=UTC).date())
+        if created:
+            logger.info("Created order partitions: %s", ", ".join(created))
+        return created
+
+    async def ensure_partitions_from(self, start: date) -> list[str]:
+        """Создаёт партиции с месяца start на months_ahead вперёд."""
+        results = await self.repositories.fan_out(
+            lambda repository: repository.ensure_partitions(
+                start=start, months_ahead=self.months_ahead
+            )
+        )
+        return _merge_names(results)
+
+    async def archive_partitions(self) -> list[str]:
+        """Архивирует партиции старше archive_after_months месяцев."""
+        before = add_months(
+            month_start(datetime.now(tz=UTC).date()), -self.archive_after_months
+        )
+        results = await self.repositories.fan_out(
+            lambda repository: repository.archive_partitions(
+                before=before,
+                statuses=ARCHIVE_STATUSES,
+                tablespace=self.archive_tablespace,
+                schema=self.archive_schema,
+            )
+        )
+        archived = _merge_names(results)
+        if archived:
+            logger.info("Archived order partitions: %s", ", ".join(archived))
+        return archived
+
+    async def maintain(self) -> None:
+        """Полный цикл обслуживания партиций."""
+        await self.ensure_partitions()
+        await self.archive_partitions()
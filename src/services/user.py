@@ -24,15 +24,18 @@ class UserService:
         self,
         user_data: UserRegisterBodySchema,
     ) -> UserDbSchema:
-        # TODO
-        #  1) В ТЗ условия нет, но нужно проверить что в базе нет такого email или login
-        #  если есть, то вернуть ошибку (например 422)
-        #  2) В реальном проекте нужно хэшировать (закодировать) пароль
-        return await self.repository.add(insert_data=user_data)
+        # TODO В реальном проекте нужно хэшировать (закодировать) пароль
+        user = await self.repository.add_unique(insert_data=user_data)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Пользователь с таким email уже существует",
+            )
+        return user
 
     async def get_token(self, email: str, password: str) -> str:
         """Возвращает токен."""
-        user: UserDbSchema = await self.repository.get_by("email", email)
+        user: UserDbSchema = await self.repository.get_by_email(email)
 
         # TODO Проверка, что пользователь существует
         #  Тут нужно раскодировать пароль и сверить
@@ -1,21 +1,50 @@
+import secrets
 from uuid import UUID
 
-from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, Security
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import HTTPException, Query, Security
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
+from starlette import status
 
+from common.config import settings
 from services.auth import AuthService
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token/")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token/", auto_error=False)
+admin_token_scheme = APIKeyHeader(name="X-Admin-Token", auto_error=False)
 
 
 # TODO: Авторизацию лучше сделать через middleware
-@inject
-def check_auth(
-    token: str = Security(oauth2_scheme),
-    auth_service: AuthService = Depends(Provide["auth_service"]),
-) -> UUID:
+# Зависимости async: синхронные FastAPI выполняет в пуле потоков.
+async def check_auth(token: str = Security(oauth2_scheme)) -> UUID:
     """Проверяет токен и возвращает user_id"""
-    payload = auth_service.decode_jwt(token)
+    payload = AuthService.decode_jwt(token)
     return UUID(payload["id"])
+
+
+async def check_stream_auth(
+    header_token: str | None = Security(optional_oauth2_scheme),
+    token: str | None = Query(None, description="Токен, если нет заголовка"),
+) -> UUID:
+    """
+    Как check_auth, но принимает токен и в параметре запроса:
+    EventSource в браузере не умеет передавать заголовки.
+    """
+    if not (token := header_token or token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    payload = AuthService.decode_jwt(token)
+    return UUID(payload["id"])
+
+
+async def check_admin(token: str | None = Security(admin_token_scheme)) -> None:
+    """Проверяет токен служебных эндпоинтов."""
+    admin_token = settings.auth.ADMIN_TOKEN
+    if not admin_token or not token or not secrets.compare_digest(token, admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Некорректный токен администратора",
+        )
@@ -0,0 +1,79 @@
+"""Bloom фильтр поверх битовой строки Redis."""
+
+import hashlib
+import math
+from collections.abc import Iterable
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class RedisBloomFilter:
+    """
+    Bloom фильтр на SETBIT/GETBIT, не требует модуля RedisBloom.
+
+    Пока фильтр не заполнен целиком (нет отметки ready) или пропала
+    сама битовая строка (вытеснена из Redis), might_contain всегда
+    отвечает True, чтобы не потерять существующие объекты.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key: str,
+        capacity: int,
+        error_rate: float,
+        enabled: bool = True,
+    ) -> None:
+        self.redis = redis
+        self.key = key
+        self.ready_key = f"{key}:ready"
+        self.enabled = enabled
+        # Оптимальные размер битовой строки и число хэш-функций.
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+
+    def _positions(self, item: Any) -> list[int]:
+        # Двойное хэширование (Kirsch-Mitzenmacher) от одного blake2b.
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8])
+        second = int.from_bytes(digest[8:]) | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    async def add(self, *items: Any) -> None:
+        """Добавляет элементы в фильтр."""
+        if not self.enabled or not items:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for item in items:
+                for position in self._positions(item):
+                    pipe.setbit(self.key, position, 1)
+            await pipe.execute()
+
+    async def add_many(self, items: Iterable[Any], chunk_size: int = 1000) -> int:
+        """Добавляет элементы пачками, возвращает их количество."""
+        chunk, total = [], 0
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                await self.add(*chunk)
+                total += len(chunk)
+                chunk.clear()
+        await self.add(*chunk)
+        return total + len(chunk)
+
+    async def might_contain(self, item: Any) -> bool:
+        """False - элемента точно нет, True - возможно есть."""
+        if not self.enabled:
+            return True
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(self.ready_key)
+            pipe.exists(self.key)
+            for position in self._positions(item):
+                pipe.getbit(self.key, position)
+            ready, exists, *bits = await pipe.execute()
+        return not (ready and exists) or all(bits)
+
+    async def mark_ready(self) -> None:
+        """Отмечает, что в фильтр добавлены все существующие элементы."""
+        await self.redis.set(self.ready_key, 1)
@@ -1,45 +1,154 @@
 import json
+import random
+from functools import wraps
 from typing import Any, Awaitable, Callable, TypeVar, get_type_hints
 
-from dependency_injector.wiring import Provide
+from fastapi import HTTPException
 from pydantic import BaseModel
 from redis.asyncio import Redis
+from starlette.status import HTTP_404_NOT_FOUND
+
+from services.utils.compression import CacheDecodeError, cache_codec
 
 
 F = TypeVar("F", bound=Callable[..., Any])
 F_AWAITABLE = TypeVar("F_AWAITABLE", bound=Callable[..., Awaitable[Any]])
 
+# Значение негативной записи кэша (объект не найден). Не может быть
+# началом JSON, поэтому не пересекается с обычными значениями.
+NOT_FOUND_MARKER = b"\x00"
+
+
+def build_cache_key(namespace: str, hash_tag: str | None = None, **kwargs: Any) -> str:
+    """
+    Формирует ключ кэша из пространства имён и именованных аргументов.
+
+    Используется и декоратором, и записью в кэш (write-through), чтобы
+    ключи совпадали. Ключи с одним hash_tag попадают в один слот Redis
+    Cluster (и на один шард), например все ключи пользователя.
+    """
+    params = ":".join(f"{key}={value}" for key, value in sorted(kwargs.items()))
+    if hash_tag is not None:
+        return f"{namespace}:{{{hash_tag}}}:{params}"
+    return f"{namespace}:{params}"
+
+
+def parse_cache_key(key: str | bytes) -> dict[str, str]:
+    """Именованные аргументы ключа build_cache_key, значения - строки."""
+    if isinstance(key, bytes):
+        key = key.decode()
+    return dict(part.split("=", 1) for part in key.split(":") if "=" in part)
+
+
+def build_access_key(namespace: str) -> str:
+    """Ключ sorted set частоты обращений к ключам кэша пространства имён."""
+    return f"cache_access:{namespace}"
+
+
+def dump_cache_value(value: Any) -> bytes:
+    """Сериализует значение для кэша, большие значения сжимаются."""
+    if isinstance(value, BaseModel):
+        return cache_codec.encode(value.model_dump_json().encode())
+    return cache_codec.encode(json.dumps(value).encode())
+
+
+def load_cache_value(raw: bytes, return_type: Any) -> Any:
+    """
+    Восстанавливает значение из кэша.
+
+    Несжатые записи (без байта заголовка) читаются как есть.
+    """
+    raw = cache_codec.decode(raw)
+    if isinstance(return_type, type) and issubclass(return_type, BaseModel):
+        return return_type.model_validate_json(raw)
+    return json.loads(raw)
+
+
+async def write_through(
+    redis: Redis,
+    values: dict[str, Any],
+    ttl: int = 300,
+    only_missing: bool = False,
+) -> None:
+    """
+    Записывает значения в кэш одним пайплайном.
+
+    only_missing - не перезаписывать существующие ключи (SET NX).
+    """
+    if not values:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, value in values.items():
+            if only_missing:
+                pipe.set(key, dump_cache_value(value), ex=ttl, nx=True)
+            else:
+                pipe.setex(key, ttl, dump_cache_value(value))
+        await pipe.execute()
+
 
 def redis_cache(
-    ttl: int = 300, is_update: bool = False, exclude_kwargs: frozenset = frozenset()
+    ttl: int = 300,
+    namespace: str | None = None,
+    is_update: bool = False,
+    exclude_kwargs: frozenset = frozenset(),
+    negative_ttl: int = 0,
+    hash_tag_kwarg: str | None = None,
+    access_sample_rate: float = 0,
 ) -> F:
-    """Декоратор для кэширования ответа в Redis."""
+    """
+    Декоратор для кэширования ответа метода в Redis.
+
+    Клиент Redis берётся из атрибута redis объекта, а не разрешается
+    контейнером на каждый вызов. Ключ строится build_cache_key
+    по именованным аргументам, поэтому декорируемые методы должны
+    вызываться с kwargs.
+    Если задан negative_ttl, ответ 404 тоже кэшируется на это время.
+    hash_tag_kwarg - аргумент, значение которого становится hash tag ключа.
+    access_sample_rate - доля обращений, которые учитываются в sorted set
+    build_access_key(namespace) для прогрева кэша самыми частыми ключами.
+    """
 
     def decorator(func: F_AWAITABLE) -> F_AWAITABLE:
-        # @wraps(func)  # с wraps не работает инъекция
-        # https://github.com/ets-labs/python-dependency-injector/issues/454
-        async def wrapper(*args, redis: Redis = Provide["redis"], **kwargs) -> Any:
-            ## TODO Переделать на middleware
-            kwargs = {k: v for k, v in kwargs.items() if k not in exclude_kwargs}
+        key_namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+        access_key = build_access_key(key_namespace)
+        return_type = None
 
-            cache_key = f"{sorted((kwargs.items()))}"
-            cached_data = await redis.get(cache_key)
+        @wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            nonlocal return_type
+            redis: Redis = self.redis
 
-            if cached_data and not is_update:
-                cache = json.loads(cached_data)
+            cache_key = build_cache_key(
+                key_namespace,
+                hash_tag=str(kwargs[hash_tag_kwarg]) if hash_tag_kwarg else None,
+                **{k: v for k, v in kwargs.items() if k not in exclude_kwargs},
+            )
 
-                hints = get_type_hints(func)  # Получаем аннотации типов
-                return_type = hints.get("return")
-                if return_type and isinstance(return_type, BaseModel):
-                    return return_type.model_validate(cache)
+            # Выборка: учёт каждого обращения стоил бы лишней команды Redis.
+            if access_sample_rate and random.random() < access_sample_rate:
+                await redis.zincrby(access_key, 1, cache_key)
 
-                return cache
+            if not is_update and (cached_data := await redis.get(cache_key)):
+                if cached_data == NOT_FOUND_MARKER:
+                    raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+                if return_type is None:
+                    # Получаем аннотации типов
+                    return_type = get_type_hints(func).get("return")
+                try:
+                    return load_cache_value(cached_data, return_type)
+                except CacheDecodeError:
+                    # Например, запись сжата со словарём, которого нет
+                    # у этого процесса - считаем промахом.
+                    pass
 
-            response = await func(*args, **kwargs)
+            try:
+                response = await func(self, *args, **kwargs)
+            except HTTPException as exc:
+                if negative_ttl and exc.status_code == HTTP_404_NOT_FOUND:
+                    await redis.setex(cache_key, negative_ttl, NOT_FOUND_MARKER)
+                raise
 
-            await redis.setex(
-                cache_key, ttl, json.dumps(response.model_dump(mode="json"))
-            )
+            await redis.setex(cache_key, ttl, dump_cache_value(response))
 
             return response
 
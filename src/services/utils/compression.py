@@ -0,0 +1,143 @@
+"""Сжатие значений кэша."""
+
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from common.config import settings
+
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard опционален
+    zstandard = None
+
+
+# Первый байт сжатого значения определяет формат. Обычные значения - JSON,
+# он не может начинаться с этих байт, поэтому старые несжатые записи
+# читаются как есть. 0x00 занят негативной записью кэша.
+HEADER_ZLIB = b"\x01"
+HEADER_ZSTD = b"\x02"
+HEADER_ZSTD_DICT = b"\x03"
+
+DECODE_ERRORS = (zlib.error,) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+class CacheDecodeError(Exception):
+    """Значение кэша не удалось распаковать."""
+
+
+@dataclass
+class CompressionStats:
+    """Метрики сжатия в рамках процесса."""
+
+    compressed: int = 0
+    skipped: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    compress_seconds: float = 0.0
+    decompressed: int = 0
+    decompress_seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Во сколько раз уменьшились сжатые значения."""
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.ratio, 3),
+            "compress_seconds": round(self.compress_seconds, 6),
+            "decompressed": self.decompressed,
+            "decompress_seconds": round(self.decompress_seconds, 6),
+        }
+
+
+class CacheCodec:
+    """
+    Сжимает значения больше threshold байт: zstd (при наличии словаря -
+    со словарём), а без пакета zstandard - zlib.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        threshold: int,
+        level: int = 3,
+        dict_path: str = "",
+    ) -> None:
+        self.enabled = enabled
+        self.threshold = threshold
+        self.level = level
+        self.stats = CompressionStats()
+
+        self._compressor = self._decompressor = None
+        self._dict_compressor = self._dict_decompressor = None
+        if zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=level)
+            self._decompressor = zstandard.ZstdDecompressor()
+            if dict_path:
+                dict_data = zstandard.ZstdCompressionDict(Path(dict_path).read_bytes())
+                self._dict_compressor = zstandard.ZstdCompressor(
+                    level=level, dict_data=dict_data
+                )
+                self._dict_decompressor = zstandard.ZstdDecompressor(
+                    dict_data=dict_data
+                )
+
+    def encode(self, data: bytes) -> bytes:
+        """Сжимает значение, если оно больше порога."""
+        if not self.enabled or len(data) < self.threshold:
+            self.stats.skipped += 1
+            return data
+
+        started = time.perf_counter()
+        if self._dict_compressor is not None:
+            encoded = HEADER_ZSTD_DICT + self._dict_compressor.compress(data)
+        elif self._compressor is not None:
+            encoded = HEADER_ZSTD + self._compressor.compress(data)
+        else:
+            encoded = HEADER_ZLIB + zlib.compress(data, self.level)
+
+        self.stats.compress_seconds += time.perf_counter() - started
+        self.stats.compressed += 1
+        self.stats.bytes_in += len(data)
+        self.stats.bytes_out += len(encoded)
+        return encoded
+
+    def decode(self, raw: bytes) -> bytes:
+        """Распаковывает значение по байту заголовка."""
+        header = raw[:1]
+        if header not in (HEADER_ZLIB, HEADER_ZSTD, HEADER_ZSTD_DICT):
+            return raw
+
+        started = time.perf_counter()
+        try:
+            if header == HEADER_ZLIB:
+                data = zlib.decompress(raw[1:])
+            elif header == HEADER_ZSTD and self._decompressor is not None:
+                data = self._decompressor.decompress(raw[1:])
+            elif header == HEADER_ZSTD_DICT and self._dict_decompressor is not None:
+                data = self._dict_decompressor.decompress(raw[1:])
+            else:
+                raise CacheDecodeError(f"No decoder for header {header!r}")
+        except DECODE_ERRORS as exc:
+            raise CacheDecodeError(str(exc)) from exc
+
+        self.stats.decompress_seconds += time.perf_counter() - started
+        self.stats.decompressed += 1
+        return data
+
+
+cache_codec = CacheCodec(
+    enabled=settings.cache.CACHE_COMPRESSION_ENABLED,
+    threshold=settings.cache.CACHE_COMPRESSION_THRESHOLD,
+    level=settings.cache.CACHE_COMPRESSION_LEVEL,
+    dict_path=settings.cache.CACHE_COMPRESSION_DICT_PATH,
+)
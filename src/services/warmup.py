@@ -0,0 +1,114 @@
+"""Прогрев соединений и кэшей запросов при старте процесса."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from functools import partial
+from uuid import uuid4
+
+from faststream.rabbit import RabbitBroker
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.db import Database
+from repositories.repositories import OrderRepository, UserRepository
+from repositories.sharding import ShardedRepository
+
+
+logger = logging.getLogger(__name__)
+
+HotQueries = Callable[[AsyncSession], Awaitable[None]]
+
+
+async def _run_all(callbacks: list[HotQueries], session: AsyncSession) -> None:
+    for callback in callbacks:
+        await callback(session)
+
+
+class WarmupService:
+    """
+    Открывает соединения с БД и Redis заранее и выполняет горячие
+    запросы репозиториев, чтобы первые запросы после выкладки не платили
+    за подключение, интроспекцию типов asyncpg и компиляцию запросов.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        redis: Redis,
+        broker: RabbitBroker,
+        user_repository: UserRepository,
+        order_repositories: ShardedRepository[OrderRepository],
+        db_connections: int = 5,
+        redis_connections: int = 5,
+        retry_interval: float = 2,
+        broker_timeout: float = 5,
+    ) -> None:
+        self.db = db
+        self.redis = redis
+        self.broker = broker
+        self.user_repository = user_repository
+        self.order_repositories = order_repositories
+        self.db_connections = db_connections
+        self.redis_connections = redis_connections
+        self.retry_interval = retry_interval
+        self.broker_timeout = broker_timeout
+
+    async def run(self) -> None:
+        """Прогревает, повторяя попытки, пока всё не станет доступно."""
+        while True:
+            try:
+                await self.warm_up()
+            except Exception:
+                logger.warning("Warm-up failed, retrying", exc_info=True)
+                await asyncio.sleep(self.retry_interval)
+            else:
+                return
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(self._warm_up_db(), self._warm_up_redis())
+        # Брокер подключается после lifespan приложения - ждём его.
+        if not await self.broker.ping(self.broker_timeout):
+            raise ConnectionError("RabbitMQ is not connected")
+
+    async def _warm_up_db(self) -> None:
+        # Основная БД и шарды заказов; без шардов заказы в основной БД.
+        queries: dict[Database, list[HotQueries]] = {self.db: [self._run_user_queries]}
+        for database, repository in self.order_repositories.items():
+            queries.setdefault(database, []).append(
+                partial(self._run_order_queries, repository)
+            )
+        await asyncio.gather(
+            *(
+                database.warm_up(self.db_connections, partial(_run_all, callbacks))
+                for database, callbacks in queries.items()
+            )
+        )
+
+    # Те же запросы, что выполняют эндпоинты; по несуществующим
+    # значениям, поэтому ничего не читают.
+
+    async def _run_user_queries(self, session: AsyncSession) -> None:
+        missing = uuid4()
+        await self.user_repository.get_by("id", missing, session=session)
+        await self.user_repository.get_many_by("id", [missing], session=session)
+        await self.user_repository.get_by_email("warmup@invalid", session=session)
+
+    async def _run_order_queries(
+        self, repository: OrderRepository, session: AsyncSession
+    ) -> None:
+        missing = uuid4()
+        now = datetime.now(UTC)
+        await repository.get_by("id", missing, session=session)
+        await repository.get_many_by("id", [missing], session=session)
+        await repository.get_orders(missing, session=session)
+        await repository.get_orders(
+            missing, created_from=now, created_to=now, session=session
+        )
+
+    async def _warm_up_redis(self) -> None:
+        # Одновременные команды берут из пула разные соединения.
+        await asyncio.gather(
+            *(self.redis.ping() for _ in range(self.redis_connections))
+        )
@@ -0,0 +1,22 @@
+import os
+
+
+# Обязательные настройки, чтобы модули приложения импортировались без .env.
+for name, value in {
+    "PROJECT_NAME": "test_task_fastapi",
+    "DB_HOST": "localhost",
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_NAME": "postgres",
+    "DB_PORT": "5432",
+    "RABBIT_HOST": "localhost",
+    "RABBIT_USER": "rabbit",
+    "RABBIT_PASSWORD": "rabbit",
+    "RABBIT_PORT": "5672",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASSWORD": "",
+    "SECRET_KEY": "test",
+    "ADMIN_TOKEN": "",
+}.items():
+    os.environ.setdefault(name, value)
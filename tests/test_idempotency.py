@@ -0,0 +1,46 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from redis.asyncio import Redis
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from middlewares.idempotency import IdempotencyMiddleware
+
+
+def make_app(events: list[str]) -> Starlette:
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        events.append("startup")
+        yield
+        events.append("shutdown")
+
+    async def create_order(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("created", status_code=201)
+
+    # Redis не нужен: запросы без Idempotency-Key к нему не обращаются.
+    return Starlette(
+        routes=[Route("/orders", create_order, methods=["POST"])],
+        lifespan=lifespan,
+        middleware=[
+            Middleware(IdempotencyMiddleware, redis=Redis(), routes=["POST /orders"])
+        ],
+    )
+
+
+def test_lifespan_passes_through() -> None:
+    events: list[str] = []
+    with TestClient(make_app(events)):
+        assert events == ["startup"]
+    assert events == ["startup", "shutdown"]
+
+
+def test_request_without_key_passes_through() -> None:
+    with TestClient(make_app([])) as client:
+        response = client.post("/orders")
+    assert response.status_code == 201
+    assert response.text == "created"
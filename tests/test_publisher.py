@@ -0,0 +1,47 @@
+import asyncio
+import contextvars
+from typing import Any
+
+from faststream.rabbit import RabbitBroker, TestRabbitBroker
+
+from broker.publisher import BrokerPublisher
+
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+
+def test_publisher_delivers_messages_in_caller_context() -> None:
+    """
+    Публикация через внутренние объекты FastStream (broker.channels)
+    доходит до подписчика, а сообщения из очереди публикуются
+    в контексте того, кто их поставил.
+    """
+    broker = RabbitBroker()
+    received: list[tuple[Any, str | None]] = []
+
+    @broker.subscriber("orders")
+    async def handle(message: dict[str, Any]) -> None:
+        received.append((message, request_id.get()))
+
+    async def run() -> None:
+        async with TestRabbitBroker(broker) as test_broker:
+            publisher = BrokerPublisher(test_broker, channels=1)
+            await publisher.start()
+            await publisher.publish({"n": 0}, "orders")
+            for n in range(1, 3):
+                request_id.set(f"request-{n}")
+                publisher.publish_nowait({"n": n}, "orders")
+            request_id.set("request-3")
+            await publisher.enqueue({"n": 3}, "orders")
+            await publisher.stop()
+
+    asyncio.run(run())
+
+    assert received == [
+        ({"n": 0}, None),
+        ({"n": 1}, "request-1"),
+        ({"n": 2}, "request-2"),
+        ({"n": 3}, "request-3"),
+    ]